@@ -0,0 +1,286 @@
+# Future imports
+from __future__ import annotations
+
+# Standard library imports
+from collections import OrderedDict
+from json import dumps, loads, JSONDecodeError
+from os import remove, replace
+from os.path import abspath, dirname
+from tempfile import mkstemp
+from threading import Event, Lock
+from time import time
+from typing import Any, Callable
+
+
+class IdempotencyCache:
+    """A class used to remember the results of requests by their
+    idempotency key.
+
+    The cache keeps at most a given number of results, evicting the
+    least recently used one when it is full, and forgets results older
+    than a given number of seconds. Every result stored is appended to
+    a journal file, which is read back when the cache is created so
+    results survive restarts, and rewritten with only the live results
+    once it grows to twice the capacity. A stored result is never
+    replaced while it is live, and requests run through the cache with
+    the same key run once, the others waiting for its result.
+
+    **Attributes**
+    :attr _path: The journal file, or None to keep results in memory
+    only.
+    :type _path: str | None
+    :attr _capacity: The maximum number of results kept.
+    :type _capacity: int
+    :attr _ttl: The seconds a result is kept for.
+    :type _ttl: float
+    :attr _clock: The function returning the current time in seconds.
+    :type _clock: Callable[[], float]
+    :attr _entries: The (time stored, result) pairs by key, from least
+    to most recently used.
+    :type _entries: OrderedDict
+    :attr _journal_lines: The number of lines in the journal file.
+    :type _journal_lines: int
+    :attr _running: The event set when the request running with each
+    key finishes.
+    :type _running: dict
+    :attr _lock: The lock that makes the cache safe to use from
+    several threads.
+    :type _lock: Lock
+
+    **Public methods**
+    :meth get: Gets the result stored with a key.
+    :meth put: Stores the result of a key.
+    :meth run_once: Runs a request unless its key has a result, and
+    gets the result.
+    """
+
+    # Special methods
+    def __init__(
+            self,
+            path: str | None = None,
+            capacity: int = 10000,
+            ttl: float = 86400,
+            clock: Callable[[], float] = time,
+    ) -> None:
+        """Initialize an IdempotencyCache object.
+
+        :param path: The journal file (default None, results are kept
+        in memory only).
+        :type path: str | None
+        :param capacity: The maximum number of results kept
+        (default 10000).
+        :type capacity: int
+        :param ttl: The seconds a result is kept for (default 86400).
+        :type ttl: float
+        :param clock: The function returning the current time in
+        seconds (default time.time).
+        :type clock: Callable[[], float]
+        """
+
+        self._path: str | None = path
+        self._capacity: int = capacity
+        self._ttl: float = ttl
+        self._clock: Callable[[], float] = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._journal_lines: int = 0
+        self._running: dict = {}
+        self._lock: Lock = Lock()
+        if path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        """Return the number of results in the cache, expired or not.
+
+        :return: The number of results.
+        :rtype: int
+        """
+
+        return len(self._entries)
+
+
+    # Public methods
+    def get(self, key: str) -> Any:
+        """Get the result stored with a key and mark it as recently
+        used.
+
+        :param key: The idempotency key.
+        :type key: str
+        :return: The result, or None if there is no result for the key
+        or it has expired.
+        :rtype: Any
+        """
+
+        with self._lock:
+            return self._get(key)
+
+    def put(self, key: str, result: Any) -> Any:
+        """Store the result of a key unless the key already has a live
+        result, evicting the least recently used results if the cache
+        is full.
+
+        :param key: The idempotency key.
+        :type key: str
+        :param result: The result, which must not be None and must be
+        serializable to JSON.
+        :type result: Any
+        :return: The result stored with the key, which is the one
+        already stored if there was one.
+        :rtype: Any
+        """
+
+        with self._lock:
+            return self._put(key, result)
+
+    def run_once(self, key: str, request: Callable[[], Any]) -> Any:
+        """Run a request and store its result, unless the key already
+        has a result or a request with the key is running, in which
+        case its result is waited for instead.
+
+        If the running request raises an error, no result is stored and
+        one of the waiting requests runs instead.
+
+        :param key: The idempotency key.
+        :type key: str
+        :param request: The function that runs the request, returning a
+        result that is not None and is serializable to JSON.
+        :type request: Callable[[], Any]
+        :return: The result stored with the key.
+        :rtype: Any
+        """
+
+        while True:
+            with self._lock:
+                result: Any = self._get(key)
+                if result is not None:
+                    return result
+                running: Event | None = self._running.get(key)
+                if running is None:
+                    running = self._running[key] = Event()
+                    break
+            running.wait()
+        try:
+            result = request()
+            with self._lock:
+                return self._put(key, result)
+        finally:
+            with self._lock:
+                del self._running[key]
+            running.set()
+
+
+    # Other methods
+    def _get(self, key: str) -> Any:
+        """Get the result stored with a key and mark it as recently
+        used, with the lock held.
+
+        :param key: The idempotency key.
+        :type key: str
+        :return: The result, or None if there is no result for the key
+        or it has expired.
+        :rtype: Any
+        """
+
+        entry: tuple | None = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] + self._ttl <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _put(self, key: str, result: Any) -> Any:
+        """Store the result of a key unless the key already has a live
+        result, with the lock held.
+
+        :param key: The idempotency key.
+        :type key: str
+        :param result: The result.
+        :type result: Any
+        :return: The result stored with the key.
+        :rtype: Any
+        """
+
+        stored: Any = self._get(key)
+        if stored is not None:
+            return stored
+        stored_at: float = self._clock()
+        self._store(key, stored_at, result)
+        if self._path is not None:
+            if self._journal_lines >= 2 * self._capacity:
+                self._compact()
+            else:
+                with open(self._path, "a") as journal:
+                    journal.write(dumps([key, stored_at, result]) + "\n")
+                self._journal_lines += 1
+        return result
+
+    def _store(self, key: str, stored_at: float, result: Any) -> None:
+        """Store a result in memory and evict the results that do not
+        fit.
+
+        :param key: The idempotency key.
+        :type key: str
+        :param stored_at: The time the result was stored, in seconds.
+        :type stored_at: float
+        :param result: The result.
+        :type result: Any
+        """
+
+        self._entries[key] = (stored_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+
+    def _load(self) -> None:
+        """Read the results stored in the journal file, skipping the
+        expired ones and a last line that was not fully written.
+
+        The journal is compacted if it has grown to twice the capacity,
+        or if its last line was not fully written so that new results
+        are not appended to it.
+        """
+
+        complete: bool = True
+        try:
+            with open(self._path, "r") as journal:
+                for line in journal:
+                    self._journal_lines += 1
+                    complete = line.endswith("\n")
+                    try:
+                        key, stored_at, result = loads(line)
+                    except (JSONDecodeError, ValueError):
+                        continue
+                    self._store(key, stored_at, result)
+        except FileNotFoundError:
+            return
+        now: float = self._clock()
+        for key in [
+            key for key, (stored_at, _) in self._entries.items()
+            if stored_at + self._ttl <= now
+        ]:
+            del self._entries[key]
+        if not complete or self._journal_lines >= 2 * self._capacity:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the journal file with only the live results, in
+        order of use.
+
+        The results are written to a new temporary file in the same
+        directory that then replaces the journal, so several processes
+        compacting the same journal never write to the same file.
+        """
+
+        descriptor, temporary_path = mkstemp(
+            suffix=".tmp", dir=dirname(abspath(self._path))
+        )
+        try:
+            with open(descriptor, "w") as journal:
+                for key, (stored_at, result) in self._entries.items():
+                    journal.write(dumps([key, stored_at, result]) + "\n")
+            replace(temporary_path, self._path)
+        except BaseException:
+            remove(temporary_path)
+            raise
+        self._journal_lines = len(self._entries)
@@ -0,0 +1,190 @@
+# Future imports
+from __future__ import annotations
+
+# Standard library imports
+from typing import Iterable
+
+
+class IntervalIndex:
+    """A class used to find the intervals overlapping a period of time.
+
+    The intervals are half-open, [start, end), with integer bounds such
+    as minutes since midnight, and each one carries a numeric value,
+    such as the tables a reservation takes, optionally followed by any
+    other data, such as the reservation itself. They are sorted by start
+    and stored as an implicit balanced binary search tree, where each
+    node also keeps the latest end of its subtree, so a query only
+    visits the branches that can overlap it and takes O(log n + k)
+    time for k overlapping intervals.
+
+    **Attributes**
+    :attr _intervals: The (start, end, value, *data) intervals sorted by
+    start.
+    :type _intervals: list
+    :attr _max_ends: The latest end of the subtree rooted at each
+    interval.
+    :type _max_ends: list
+
+    **Public methods**
+    :meth overlapping: Gets the intervals overlapping a period.
+    :meth containing: Gets the intervals containing an instant.
+    :meth load_at: Gets the total value in use at an instant.
+    :meth peak_load: Gets the highest total value in use during a
+    period.
+    """
+
+    # Special methods
+    def __init__(self, intervals: Iterable[tuple] = ()) -> None:
+        """Initialize an IntervalIndex object.
+
+        :param intervals: The (start, end, value, *data) intervals to
+        index (default none).
+        :type intervals: Iterable[tuple]
+        """
+
+        self._intervals: list = sorted(
+            intervals, key=lambda interval: interval[0]
+        )
+        self._max_ends: list = [0] * len(self._intervals)
+        self._build(0, len(self._intervals))
+
+    def __len__(self) -> int:
+        """Return the number of intervals in the index.
+
+        :return: The number of intervals.
+        :rtype: int
+        """
+
+        return len(self._intervals)
+
+
+    # Public methods
+    def overlapping(self, start: int, end: int) -> list:
+        """Get the intervals overlapping a period.
+
+        :param start: The start of the period.
+        :type start: int
+        :param end: The end of the period, not included.
+        :type end: int
+        :return: A list of the (start, end, value, *data) intervals
+        that overlap the period, sorted by start.
+        :rtype: list
+        """
+
+        found: list = []
+        self._search(0, len(self._intervals), start, end, found)
+        return found
+
+    def containing(self, instant: int) -> list:
+        """Get the intervals containing an instant.
+
+        :param instant: The instant.
+        :type instant: int
+        :return: A list of the (start, end, value, *data) intervals
+        that contain the instant, sorted by start.
+        :rtype: list
+        """
+
+        return self.overlapping(instant, instant + 1)
+
+    def load_at(self, instant: int) -> int:
+        """Get the total value of the intervals containing an instant.
+
+        :param instant: The instant.
+        :type instant: int
+        :return: The sum of the values of the intervals in use at the
+        instant.
+        :rtype: int
+        """
+
+        return sum(interval[2] for interval in self.containing(instant))
+
+    def peak_load(self, start: int, end: int) -> int:
+        """Get the highest total value in use at any instant of a
+        period.
+
+        The intervals overlapping the period are swept in order of
+        their start and end points within it.
+
+        :param start: The start of the period.
+        :type start: int
+        :param end: The end of the period, not included.
+        :type end: int
+        :return: The highest sum of the values of the intervals in use
+        at the same instant during the period.
+        :rtype: int
+        """
+
+        events: list = []
+        for interval_start, interval_end, value, *_ in self.overlapping(
+            start, end
+        ):
+            events.append((max(interval_start, start), value))
+            events.append((min(interval_end, end), -value))
+        # Ends sort before starts at the same instant, as they free it
+        events.sort(key=lambda event: (event[0], event[1] > 0))
+        load: int = 0
+        peak: int = 0
+        for _, change in events:
+            load += change
+            peak = max(peak, load)
+        return peak
+
+
+    # Other methods
+    def _build(self, low: int, high: int) -> int | None:
+        """Compute the latest end of each subtree of the index.
+
+        :param low: The first position of the subtree.
+        :type low: int
+        :param high: The position after the last one of the subtree.
+        :type high: int
+        :return: The latest end of the subtree, or None if it is empty.
+        :rtype: int | None
+        """
+
+        if low >= high:
+            return None
+        middle: int = (low + high) // 2
+        self._max_ends[middle] = max(
+            end for end in (
+                self._intervals[middle][1],
+                self._build(low, middle),
+                self._build(middle + 1, high),
+            )
+            if end is not None
+        )
+        return self._max_ends[middle]
+
+    def _search(
+        self, low: int, high: int, start: int, end: int, found: list
+    ) -> None:
+        """Add the intervals of a subtree overlapping a period to a
+        list.
+
+        :param low: The first position of the subtree.
+        :type low: int
+        :param high: The position after the last one of the subtree.
+        :type high: int
+        :param start: The start of the period.
+        :type start: int
+        :param end: The end of the period, not included.
+        :type end: int
+        :param found: The list the overlapping intervals are added to.
+        :type found: list
+        """
+
+        if low >= high:
+            return
+        middle: int = (low + high) // 2
+        # No interval of the subtree ends after the period starts
+        if self._max_ends[middle] <= start:
+            return
+        self._search(low, middle, start, end, found)
+        interval: tuple = self._intervals[middle]
+        # The intervals to the right start after the period ends too
+        if interval[0] >= end:
+            return
+        if interval[1] > start:
+            found.append(interval)
+        self._search(middle + 1, high, start, end, found)
@@ -0,0 +1,413 @@
+# Future imports
+from __future__ import annotations
+
+# Standard library imports
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from os.path import join
+from random import Random
+from shutil import copyfile
+from statistics import quantiles
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+# Local imports
+from interval_index import IntervalIndex
+from reservation import Reservation
+
+
+# Traffic constants
+_first_names: list = [
+    "Ana", "Dani", "Joe", "Lucía", "Martiño", "María", "Pablo", "Sara",
+    "Iñigo", "Elena", "Jorge", "Nuria", "Óscar", "Carmen", "Raúl", "Marta",
+]
+_last_names: list = [
+    "Berrocal", "Gómez", "Rodríguez", "García", "Martín", "López",
+    "Pérez", "Sánchez", "Núñez", "Fernández", "Díaz", "Ruiz", "Muñoz",
+    "Álvarez", "Romero", "Ibáñez",
+]
+_operation_weights: dict = {
+    "book": 40,
+    "lookup": 40,
+    "update": 10,
+    "cancel": 10,
+}
+_slot_weights: dict = {
+    "12:00": 2,
+    "13:30": 2,
+    "14:00": 3,
+    "15:00": 1,
+    "20:00": 8,
+    "20:30": 3,
+    "21:00": 3,
+    "22:00": 6,
+}
+_duration_weights: dict = {
+    60: 1, 90: 3, 120: 8, 150: 3, 180: 2, 240: 1,
+}
+_people_weights: dict = {
+    1: 2, 2: 8, 3: 3, 4: 6, 5: 1, 6: 2, 7: 1, 8: 1,
+    10: 1, 12: 1, 16: 1,
+}
+_weekend_weight: int = 3
+
+
+def main():
+    """Main function of the script.
+
+    Parse the command-line options, generate the traffic and replay it
+    against a copy of the database, then print the report.
+    """
+
+    parser: ArgumentParser = ArgumentParser(
+        description="Replay generated reservation traffic concurrently "
+        "against a copy of the database."
+    )
+    parser.add_argument(
+        "-n", "--operations", type=int, default=1000,
+        help="number of operations to generate (default 1000)",
+    )
+    parser.add_argument(
+        "-c", "--names", type=int, default=200,
+        help="number of distinct names used; fewer names means more "
+        "name collisions (default 200)",
+    )
+    parser.add_argument(
+        "-d", "--days", type=int, default=30,
+        help="number of days ahead bookings are spread over (default 30)",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=8,
+        help="number of concurrent workers (default 8)",
+    )
+    parser.add_argument(
+        "-r", "--retries", type=float, default=0.0,
+        help="fraction of bookings, updates and cancellations sent again "
+        "with the same idempotency key (default 0)",
+    )
+    parser.add_argument(
+        "-s", "--seed", type=int, default=None,
+        help="seed of the traffic generator",
+    )
+    arguments = parser.parse_args()
+
+    traffic: list = generate_traffic(
+        arguments.operations, arguments.names, arguments.days,
+        arguments.retries, arguments.seed,
+    )
+    with TemporaryDirectory() as directory:
+        # Work on a copy so the real database is never modified
+        Reservation._database_path = join(directory, "database.json")
+        Reservation._database_index = join(directory, "database_index.json")
+        Reservation._change_log = join(directory, "changes.jsonl")
+        Reservation._idempotency_journal = join(directory, "keys.jsonl")
+        copyfile("reservation_database.json", Reservation._database_path)
+        report: dict = run_load_test(traffic, arguments.workers)
+    print(format_report(report))
+
+
+def generate_traffic(
+    operations: int,
+    names: int,
+    days: int = 30,
+    retries: float = 0.0,
+    seed: int | None = None,
+) -> list:
+    """Generate a list of realistic reservation operations.
+
+    Bookings and updates favour the 20:00 and 22:00 starts and
+    weekends, and all operations draw their names from a pool of the
+    given size. Each booking, update and cancellation has its own
+    idempotency key, and some of them are sent again later with the
+    same key, as partner channels do when a request times out.
+
+    :param operations: The number of operations to generate.
+    :type operations: int
+    :param names: The number of distinct names in the pool.
+    :type names: int
+    :param days: The number of days ahead, starting tomorrow, that
+    bookings are spread over (default 30).
+    :type days: int
+    :param retries: The fraction of bookings, updates and
+    cancellations sent again (default 0).
+    :type retries: float
+    :param seed: The seed of the random generator (default None).
+    :type seed: int | None
+    :return: A list of (operation, name, date, time, people, duration,
+    idempotency key) tuples, with the date, time, people and duration
+    as they are entered by a user and no key for lookups.
+    :rtype: list
+    :raise ValueError: If names is not a positive number.
+    """
+
+    if names < 1:
+        raise ValueError("The name pool must not be empty")
+    generator: Random = Random(seed)
+    pool: list = [generate_name(i) for i in range(names)]
+    dates: list = [
+        date.today() + timedelta(days=i) for i in range(1, days + 1)
+    ]
+    date_weights: list = [
+        _weekend_weight if rdate.weekday() >= 5 else 1 for rdate in dates
+    ]
+    traffic: list = []
+    for number, operation in enumerate(
+        generator.choices(
+            list(_operation_weights), list(_operation_weights.values()),
+            k=operations,
+        )
+    ):
+        rdate: date = generator.choices(dates, date_weights)[0]
+        traffic.append(
+            (
+                operation,
+                generator.choice(pool),
+                rdate.strftime("%d-%m-%Y"),
+                generator.choices(
+                    list(_slot_weights), list(_slot_weights.values())
+                )[0],
+                str(
+                    generator.choices(
+                        list(_people_weights), list(_people_weights.values())
+                    )[0]
+                ),
+                str(
+                    generator.choices(
+                        list(_duration_weights),
+                        list(_duration_weights.values()),
+                    )[0]
+                ),
+                None if operation == "lookup" else str(number),
+            )
+        )
+    # Send some writes again after the original request
+    for position in range(len(traffic)):
+        if traffic[position][-1] is not None and generator.random() < retries:
+            traffic.insert(
+                generator.randint(position + 1, len(traffic)),
+                traffic[position],
+            )
+    return traffic
+
+
+def generate_name(number: int) -> str:
+    """Return a distinct name, valid for a reservation, for a number.
+
+    :param number: A non-negative number.
+    :type number: int
+    :return: A name in the "First-name Last-name" format.
+    :rtype: str
+    """
+
+    number, first = divmod(number, len(_first_names))
+    number, last = divmod(number, len(_last_names))
+    # Append letters to the last name once every combination is used
+    suffix: str = ""
+    while number:
+        number, letter = divmod(number - 1, 26)
+        suffix = chr(ord("a") + letter) + suffix
+    return f"{_first_names[first]} {_last_names[last]}{suffix}"
+
+
+def run_load_test(traffic: list, workers: int) -> dict:
+    """Replay a list of operations concurrently against the database.
+
+    :param traffic: A list of operations, as returned by
+    generate_traffic.
+    :type traffic: list
+    :param workers: The number of operations run at the same time.
+    :type workers: int
+    :return: A report with the duration of the run, the number of
+    operations completed, the latencies of the completed operations and
+    the number of operations that failed with an error, by kind of
+    operation, the number of retries and of those answered with a
+    different result than the original request, the overbooked
+    services, rows sharing a name and lost updates found in the
+    database afterwards, and the names whose final reservation cannot
+    be checked because their last write failed with an error.
+    :rtype: dict
+    """
+
+    start: float = perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results: list = list(executor.map(_run_operation, traffic))
+    duration: float = perf_counter() - start
+
+    latencies: dict = {operation: [] for operation in _operation_weights}
+    errors: dict = {operation: 0 for operation in _operation_weights}
+    retries: int = 0
+    inconsistent_retries: int = 0
+    # The result of the original request of each idempotency key
+    originals: dict = {}
+    # The last write of each name that was acknowledged or failed with
+    # an error, by completion time
+    expected: dict = {}
+    for (operation, name, *_, key), result in zip(traffic, results):
+        succeeded, record, started, finished = result
+        if succeeded is None:
+            errors[operation] += 1
+        else:
+            latencies[operation].append(finished - started)
+        if key in originals:
+            retries += 1
+            inconsistent_retries += (
+                None not in (succeeded, originals[key])
+                and succeeded != originals[key]
+            )
+            continue
+        if key is not None:
+            originals[key] = succeeded
+        # A failed write may or may not have reached the database
+        if operation != "lookup" and succeeded is not False:
+            if name not in expected or expected[name][0] < finished:
+                expected[name] = (finished, succeeded, record)
+
+    database: list = list(Reservation._iter_reservations())
+    # Every row stored with each name, as concurrent bookings of the
+    # same name can all be written
+    rows: dict = {}
+    for reservation in database:
+        rows.setdefault(reservation["name"], []).append(reservation)
+    return {
+        "operations": len(traffic),
+        "completed": sum(map(len, latencies.values())),
+        "duration": duration,
+        "latencies": latencies,
+        "errors": errors,
+        "retries": retries,
+        "inconsistent_retries": inconsistent_retries,
+        "overbooked": count_overbooked_services(database),
+        "duplicate_names": count_duplicate_names(database),
+        # A cancellation is kept if there is no row left with its name
+        "lost_updates": sum(
+            1 for name, (_, succeeded, record) in expected.items()
+            if succeeded and record not in rows.get(name, [None])
+        ),
+        "unverified_names": sum(
+            1 for _, succeeded, _ in expected.values() if succeeded is None
+        ),
+    }
+
+
+def _run_operation(operation: tuple) -> tuple:
+    """Run a single operation against the database and time it.
+
+    :param operation: An (operation, name, date, time, people,
+    duration, idempotency key) tuple.
+    :type operation: tuple
+    :return: Whether the operation succeeded (None if it raised an
+    error), the reservation the name is expected to have afterwards,
+    and the start and finish times of the operation.
+    :rtype: tuple
+    """
+
+    kind, name, rdate, rtime, people, duration, key = operation
+    started: float = perf_counter()
+    record: dict | None = None
+    try:
+        match kind:
+            case "book":
+                reservation = Reservation(
+                    name, rdate, rtime, people, duration
+                )
+                record = reservation._as_record()
+                succeeded: bool = Reservation._book_reservation(
+                    reservation, key
+                )
+            case "lookup":
+                succeeded = Reservation._find_reservation(name) is not None
+            case "update":
+                reservation = Reservation(
+                    name, rdate, rtime, people, duration
+                )
+                record = reservation._as_record()
+                succeeded = Reservation._change_reservation(
+                    name, reservation, key
+                )
+            case "cancel":
+                succeeded = Reservation._remove_reservation(name, key)
+    except (ValueError, OSError):
+        # Readers can find the database half written by another worker
+        succeeded = None
+    return succeeded, record, started, perf_counter()
+
+
+def count_overbooked_services(reservations) -> int:
+    """Count the dates booked beyond the restaurant's tables.
+
+    :param reservations: An iterable of reservations as dictionaries.
+    :type reservations: Iterable[dict]
+    :return: The number of dates when, at some instant, the
+    reservations in progress need more tables than the restaurant has.
+    :rtype: int
+    """
+
+    intervals: dict = {}
+    for reservation in reservations:
+        intervals.setdefault(reservation["date"], []).append(
+            Reservation._get_interval(reservation)
+        )
+    return sum(
+        1 for date_intervals in intervals.values()
+        if IntervalIndex(date_intervals).peak_load(0, 48 * 60)
+        > Reservation._restaurant_tables
+    )
+
+
+def count_duplicate_names(reservations) -> int:
+    """Count the reservations stored with a name already taken.
+
+    :param reservations: An iterable of reservations as dictionaries.
+    :type reservations: Iterable[dict]
+    :return: The number of reservations beyond the first one of each
+    name.
+    :rtype: int
+    """
+
+    names: list = [reservation["name"] for reservation in reservations]
+    return len(names) - len(set(names))
+
+
+def format_report(report: dict) -> str:
+    """Format a load test report to be printed.
+
+    :param report: A report as returned by run_load_test.
+    :type report: dict
+    :return: A multiline string with the throughput and the latency
+    percentiles of the completed operations, the errors of each kind of
+    operation and the problems found.
+    :rtype: str
+    """
+
+    lines: list = [
+        f"Operations: {report["operations"]} in "
+        f"{report["duration"]:.2f} s, {report["completed"]} completed "
+        f"({report["completed"] / report["duration"]:.1f} ops/s)",
+        "Latency (ms)      p50      p90      p99   errors",
+    ]
+    for operation, latencies in report["latencies"].items():
+        if len(latencies) < 2:
+            percentiles: str = f"{"-":>9}" * 3
+        else:
+            cuts: list = quantiles(latencies, n=100)
+            percentiles = "".join(
+                f"{cuts[p - 1] * 1000:9.2f}" for p in (50, 90, 99)
+            )
+        lines.append(
+            f"{operation:<12}{percentiles}{report["errors"][operation]:9}"
+        )
+    lines += [
+        f"Names whose last write failed with an error: "
+        f"{report["unverified_names"]}",
+        f"Retries: {report["retries"]} "
+        f"({report["inconsistent_retries"]} with a different result)",
+        f"Overbooked dates: {report["overbooked"]}",
+        f"Duplicate names: {report["duplicate_names"]}",
+        f"Lost updates: {report["lost_updates"]}",
+    ]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+# Future imports
+from __future__ import annotations
+
+# Standard library imports
+from bisect import bisect_left, insort
+from heapq import heappush, heapreplace, nlargest
+from itertools import repeat
+from math import ceil
+from typing import Iterable, Iterator
+from unicodedata import combining, normalize
+
+
+class NameIndex:
+    """A class used to search reservation names by similarity or
+    prefix.
+
+    Names are folded to lowercase without accents before being indexed,
+    so "martino rodriguez" finds "Martiño Rodríguez". The index works on
+    the distinct words of the names, which are far fewer than the names
+    themselves: each word of a query is matched against similar words
+    through the trigrams they share, or against the words starting with
+    it through a sorted list, and the names containing those words are
+    then ranked.
+
+    **Attributes**
+    :attr _names: The original names indexed by their folded form.
+    :type _names: dict
+    :attr _words: A sorted list of the folded names that contain each
+    folded word.
+    :type _words: dict
+    :attr _word_trigrams: The trigrams of each folded word.
+    :type _word_trigrams: dict
+    :attr _trigrams: The folded words that contain each trigram.
+    :type _trigrams: dict
+    :attr _prefixes: A sorted list of the folded words.
+    :type _prefixes: list
+
+    **Public methods**
+    :meth add: Adds a name to the index.
+    :meth remove: Removes a name from the index.
+    :meth search: Gets the names most similar to a query.
+    :meth complete: Gets the names whose words start with a prefix.
+    """
+
+    # Special methods
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        """Initialize a NameIndex object.
+
+        :param names: The names to index (default none).
+        :type names: Iterable[str]
+        """
+
+        self._names: dict = {}
+        self._words: dict = {}
+        self._word_trigrams: dict = {}
+        self._trigrams: dict = {}
+        self._prefixes: list = []
+        for name in names:
+            self._prefixes.extend(self._index(name, keep_sorted=False))
+        self._prefixes.sort()
+        for folded_names in self._words.values():
+            folded_names.sort()
+
+    def __contains__(self, name: str) -> bool:
+        """Return whether a name is in the index.
+
+        :param name: The name to look for.
+        :type name: str
+        :return: True if the name is in the index, False otherwise.
+        :rtype: bool
+        """
+
+        return name in self._names.get(fold_name(name), ())
+
+
+    # Public methods
+    def add(self, name: str) -> None:
+        """Add a name to the index.
+
+        :param name: The name to add.
+        :type name: str
+        """
+
+        for word in self._index(name):
+            insort(self._prefixes, word)
+
+    def remove(self, name: str) -> None:
+        """Remove a name from the index, if it is in it.
+
+        :param name: The name to remove.
+        :type name: str
+        """
+
+        folded: str = fold_name(name)
+        names: set = self._names.get(folded, set())
+        if name not in names:
+            return
+        names.remove(name)
+        # Unindex the folded name once no name folds to it
+        if names:
+            return
+        del self._names[folded]
+        for word in set(folded.split()):
+            folded_names: list = self._words[word]
+            del folded_names[bisect_left(folded_names, folded)]
+            if folded_names:
+                continue
+            # Unindex the word once no name contains it
+            del self._words[word]
+            for trigram in self._word_trigrams.pop(word):
+                self._trigrams[trigram].discard(word)
+                if not self._trigrams[trigram]:
+                    del self._trigrams[trigram]
+            del self._prefixes[bisect_left(self._prefixes, word)]
+
+    def search(
+        self, query: str, limit: int = 5, similarity: float = 0.5
+    ) -> list:
+        """Get the names most similar to a query.
+
+        Each word of the query is matched against the most similar
+        words in the index. The names containing those matches are then
+        scored by how well their words match the words of the query,
+        going through the words of the query with the fewest names
+        first and their best matches first, and stopping once no name
+        left can score higher than the ones found.
+
+        :param query: The name to search for, possibly misspelt.
+        :type query: str
+        :param limit: The maximum number of names returned (default 5).
+        :type limit: int
+        :param similarity: The minimum fraction of the trigrams of a
+        word of the query that a word must contain to match it
+        (default 0.5).
+        :type similarity: float
+        :return: A list of names, from most to least similar.
+        :rtype: list
+        """
+
+        tokens: list = fold_name(query).split()
+        matches: list = [
+            self._match_word(token, similarity) for token in tokens
+        ]
+        # The most each word of the query can add to a score
+        maxima: list = [max(match.values(), default=0) for match in matches]
+        best: list = []
+        scored: set = set()
+        for i in sorted(
+            (i for i, match in enumerate(matches) if match),
+            key=lambda i: sum(len(self._words[word]) for word in matches[i]),
+        ):
+            # The names not scored yet contain no match of the words of
+            # the query already processed
+            others: float = sum(maxima) - maxima[i]
+            maxima[i] = 0
+            for word, word_score in sorted(
+                matches[i].items(), key=lambda item: item[1], reverse=True
+            ):
+                bound: float = (word_score + others) / len(tokens)
+                for candidate in self._words[word]:
+                    if len(best) == limit and best[0][0] >= bound:
+                        break
+                    if candidate in scored:
+                        continue
+                    scored.add(candidate)
+                    words: list = candidate.split()
+                    score: float = sum(
+                        max(map(match.get, words, repeat(0)))
+                        for match in matches
+                    ) / len(tokens)
+                    if len(best) < limit:
+                        heappush(best, (score, candidate))
+                    elif score > best[0][0]:
+                        heapreplace(best, (score, candidate))
+                if len(best) == limit and best[0][0] >= bound:
+                    # The names left with this word or worse matches may
+                    # still match the words of the query not processed
+                    maxima[i] = word_score
+                    break
+        return [
+            name for _, folded in sorted(best, reverse=True)
+            for name in sorted(self._names[folded])
+        ][:limit]
+
+    def complete(self, prefix: str, limit: int = 5) -> list:
+        """Get the names whose words start with a prefix.
+
+        Every word of the prefix but the last must be a whole word of
+        the name, and the last one the start of another word, so
+        "Martiño Rod" finds "Martiño Rodríguez" and "rod" finds every
+        name with a word starting with "rod".
+
+        :param prefix: The start of the name, the first name or the
+        last name.
+        :type prefix: str
+        :param limit: The maximum number of names returned (default 5).
+        :type limit: int
+        :return: A list of names, in alphabetical order of the word
+        matching the last word of the prefix.
+        :rtype: list
+        """
+
+        tokens: list = fold_name(prefix).split()
+        if not tokens:
+            return []
+        *whole_words, partial = tokens
+        if not all(word in self._words for word in whole_words):
+            return []
+        whole_word_names: list = sorted(
+            (self._words[word] for word in whole_words), key=len
+        )
+        first: int = bisect_left(self._prefixes, partial)
+        last: int = bisect_left(self._prefixes, partial + chr(0x10FFFF))
+        names: dict = {}
+        # Few names have the whole words: check which of them have a
+        # word starting with the last word of the prefix
+        if whole_word_names and len(whole_word_names[0]) < last - first:
+            matches: list = []
+            for folded in whole_word_names[0]:
+                words: list = [
+                    word for word in folded.split()
+                    if word.startswith(partial)
+                ]
+                if words and all(
+                    _contains(folded_names, folded)
+                    for folded_names in whole_word_names[1:]
+                ):
+                    matches.append((min(words), folded))
+            for _, folded in sorted(matches):
+                for name in sorted(self._names[folded]):
+                    names[name] = None
+            return list(names)[:limit]
+        # Otherwise, go through the words starting with the last word of
+        # the prefix until enough names are found
+        for position in range(first, last):
+            for folded in _intersect(
+                [self._words[self._prefixes[position]], *whole_word_names]
+            ):
+                for name in sorted(self._names[folded]):
+                    names[name] = None
+                if len(names) >= limit:
+                    return list(names)[:limit]
+        return list(names)[:limit]
+
+
+    # Other methods
+    def _index(self, name: str, keep_sorted: bool = True) -> list:
+        """Index the folded form of a name by its words.
+
+        :param name: The name to index.
+        :type name: str
+        :param keep_sorted: Whether to keep the lists of names of each
+        word sorted, or leave them to be sorted after indexing many
+        names (default True).
+        :type keep_sorted: bool
+        :return: The words that were not in the index yet, to be added
+        to the prefix list.
+        :rtype: list
+        """
+
+        folded: str = fold_name(name)
+        new_words: list = []
+        if folded not in self._names:
+            self._names[folded] = set()
+            for word in set(folded.split()):
+                if word not in self._words:
+                    self._words[word] = []
+                    self._word_trigrams[word] = get_trigrams(word)
+                    for trigram in self._word_trigrams[word]:
+                        self._trigrams.setdefault(trigram, set()).add(word)
+                    new_words.append(word)
+                if keep_sorted:
+                    insort(self._words[word], folded)
+                else:
+                    self._words[word].append(folded)
+        self._names[folded].add(name)
+        return new_words
+
+    def _match_word(
+        self, token: str, similarity: float, limit: int = 10
+    ) -> dict:
+        """Get the words most similar to a word of a query.
+
+        Only the words that share a given fraction of the token's
+        trigrams can match, so the candidates are taken from the rarest
+        trigrams alone and then ranked by their Dice coefficient with
+        the token.
+
+        :param token: A folded word of the query.
+        :type token: str
+        :param similarity: The minimum fraction of the token's trigrams
+        that a word must contain.
+        :type similarity: float
+        :param limit: The maximum number of words returned
+        (default 10).
+        :type limit: int
+        :return: A dictionary with the Dice coefficient of each
+        matching word.
+        :rtype: dict
+        """
+
+        token_trigrams: set = get_trigrams(token)
+        required: int = max(1, ceil(similarity * len(token_trigrams)))
+        rarest: list = sorted(
+            token_trigrams,
+            key=lambda trigram: len(self._trigrams.get(trigram, ())),
+        )[:len(token_trigrams) - required + 1]
+        scores: list = []
+        for word in set().union(
+            *(self._trigrams.get(trigram, ()) for trigram in rarest)
+        ):
+            word_trigrams: set = self._word_trigrams[word]
+            shared: int = len(token_trigrams & word_trigrams)
+            if shared >= required:
+                dice: float = (
+                    2 * shared / (len(token_trigrams) + len(word_trigrams))
+                )
+                scores.append((dice, word))
+        return {word: score for score, word in nlargest(limit, scores)}
+
+
+def _intersect(lists: list) -> Iterator[str]:
+    """Yield the folded names in every one of several sorted lists.
+
+    Each list is searched from the name being checked on, skipping the
+    names that cannot be in the others, so the time taken depends on
+    how the lists interleave rather than on their length.
+
+    :param lists: A list of sorted lists of folded names.
+    :type lists: list
+    :return: An iterator over the folded names in every list, in
+    order.
+    :rtype: Iterator[str]
+    """
+
+    if not all(lists):
+        return
+    positions: list = [0] * len(lists)
+    candidate: str = max(folded_names[0] for folded_names in lists)
+    while True:
+        for i, folded_names in enumerate(lists):
+            positions[i] = bisect_left(folded_names, candidate, positions[i])
+            if positions[i] == len(folded_names):
+                return
+            if folded_names[positions[i]] != candidate:
+                candidate = folded_names[positions[i]]
+                break
+        else:
+            yield candidate
+            positions[0] += 1
+            if positions[0] == len(lists[0]):
+                return
+            candidate = lists[0][positions[0]]
+
+
+def _contains(folded_names: list, folded: str) -> bool:
+    """Return whether a sorted list of folded names contains a name.
+
+    :param folded_names: A sorted list of folded names.
+    :type folded_names: list
+    :param folded: The folded name to look for.
+    :type folded: str
+    :return: True if the name is in the list, False otherwise.
+    :rtype: bool
+    """
+
+    position: int = bisect_left(folded_names, folded)
+    return position < len(folded_names) and folded_names[position] == folded
+
+
+def fold_name(name: str) -> str:
+    """Fold a name to lowercase without accents or extra spaces.
+
+    :param name: A name in any case, with or without accents.
+    :type name: str
+    :return: The folded name, e.g. "martino rodriguez" for
+    "Martiño  Rodríguez".
+    :rtype: str
+    """
+
+    return " ".join(
+        "".join(
+            character for character in normalize("NFKD", name)
+            if not combining(character)
+        ).lower().split()
+    )
+
+
+def get_trigrams(word: str) -> set:
+    """Get the trigrams of a folded word.
+
+    The word is padded with spaces so that its first and last
+    characters also start and end a trigram.
+
+    :param word: A word folded with fold_name.
+    :type word: str
+    :return: The set of trigrams of the word.
+    :rtype: set
+    """
+
+    padded: str = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
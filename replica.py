@@ -0,0 +1,270 @@
+# Future imports
+from __future__ import annotations
+
+# Standard library imports
+from argparse import ArgumentParser
+from json import dumps, loads
+from multiprocessing.connection import Connection, Listener
+
+# Local imports
+from name_index import NameIndex
+from reservation import Reservation, validate_name
+
+
+class ReservationReplica:
+    """A class used to represent a read-only copy of the reservations.
+
+    A replica is bootstrapped from a snapshot of the database and then
+    kept up to date by reading the events appended to the change log,
+    so lookups are answered from memory without reading the database.
+
+    **Attributes**
+    :attr _reservations: The reservations indexed by name.
+    :type _reservations: dict
+    :attr _names: The index used to search the reservation names.
+    :type _names: NameIndex
+    :attr _sequence: The sequence number of the last event applied.
+    :type _sequence: int
+    :attr _position: The position in bytes of the next event to read
+    from the change log.
+    :type _position: int
+
+    **Public methods**
+    :meth refresh: Applies the events appended to the change log.
+    :meth lookup: Gets the reservation with a name.
+    :meth search: Gets the reservations with the names most similar
+    to a query.
+    :meth serve: Answers the name searches sent to a listener.
+    """
+
+    # Special methods
+    def __init__(self, snapshot: dict | None = None) -> None:
+        """Initialize a ReservationReplica object.
+
+        :param snapshot: A snapshot as returned by
+        Reservation._take_snapshot (default a new snapshot).
+        :type snapshot: dict | None
+        """
+
+        if snapshot is None:
+            snapshot = Reservation._take_snapshot()
+        self._reservations: dict = {
+            reservation["name"]: reservation
+            for reservation in snapshot["reservations"]
+        }
+        self._names: NameIndex = NameIndex(self._reservations)
+        self._sequence: int = snapshot["sequence"]
+        self._position: int = snapshot["position"]
+
+    def __len__(self) -> int:
+        """Return the number of reservations in the replica.
+
+        :return: The number of reservations.
+        :rtype: int
+        """
+
+        return len(self._reservations)
+
+
+    # Getters
+    @property
+    def sequence(self) -> int:
+        """Get the sequence number of the last event applied.
+
+        :return: The sequence number of the last event applied.
+        :rtype: int
+        """
+
+        return self._sequence
+
+    @property
+    def lag(self) -> int:
+        """Get the number of events in the change log not yet applied.
+
+        :return: The number of events the replica is behind the
+        database.
+        :rtype: int
+        """
+
+        sequence, _ = Reservation._get_change_log_position()
+        return sequence - self._sequence
+
+
+    # Public methods
+    def refresh(self) -> int:
+        """Apply the events appended to the change log since the last
+        refresh.
+
+        A last line that is still being written is left for the next
+        refresh.
+
+        :return: The number of events applied.
+        :rtype: int
+        """
+
+        applied: int = 0
+        try:
+            with open(Reservation._change_log, "rb") as change_log:
+                change_log.seek(self._position)
+                for line in change_log:
+                    if not line.endswith(b"\n"):
+                        break
+                    self._apply(loads(line))
+                    self._position += len(line)
+                    applied += 1
+        except FileNotFoundError:
+            pass
+        return applied
+
+    def lookup(self, name: str) -> dict | None:
+        """Get the reservation with a name after refreshing the replica.
+
+        :param name: The validated name of the reservation.
+        :type name: str
+        :return: The reservation as a dictionary, or None if there is
+        no reservation with that name.
+        :rtype: dict | None
+        """
+
+        self.refresh()
+        return self._reservations.get(name)
+
+    def search(self, query: str, limit: int = 5) -> list:
+        """Get the reservations with the names most similar to a query
+        after refreshing the replica.
+
+        Accents and case are ignored, so misspelt names and names
+        typed without accents are found. If no name is similar enough,
+        the names starting with the query are returned instead.
+
+        :param query: The name to search for, or the start of it.
+        :type query: str
+        :param limit: The maximum number of reservations returned
+        (default 5).
+        :type limit: int
+        :return: A list of reservations as dictionaries, from the most
+        to the least similar name.
+        :rtype: list
+        """
+
+        self.refresh()
+        names: list = (
+            self._names.search(query, limit)
+            or self._names.complete(query, limit)
+        )
+        return [self._reservations[name] for name in names]
+
+    def serve(self, listener: Listener) -> None:
+        """Answer the name searches sent to a listener until it is
+        closed.
+
+        Each connection sends a name encoded as UTF-8 and receives the
+        JSON list of the most similar reservation names, which is what
+        Reservation._print_similar_names asks for when a name has no
+        reservation.
+
+        :param listener: The listener the searches are sent to.
+        :type listener: Listener
+        """
+
+        while True:
+            try:
+                connection: Connection = listener.accept()
+            except OSError:
+                return
+            with connection:
+                try:
+                    name: str = connection.recv_bytes().decode()
+                    connection.send_bytes(dumps([
+                        reservation["name"]
+                        for reservation in self.search(name)
+                    ]).encode())
+                except (OSError, EOFError, UnicodeDecodeError):
+                    # A client that went away must not stop the replica
+                    pass
+
+
+    # Other methods
+    def _apply(self, event: dict) -> None:
+        """Apply a change log event to the replica.
+
+        :param event: A change log event.
+        :type event: dict
+        """
+
+        reservation: dict = event["reservation"]
+        match event["operation"]:
+            case "create":
+                self._reservations[reservation["name"]] = reservation
+                self._names.add(reservation["name"])
+            case "cancel":
+                self._reservations.pop(reservation["name"], None)
+                self._names.remove(reservation["name"])
+        self._sequence = event["sequence"]
+
+
+def main():
+    """Main function of the script.
+
+    Bootstrap a replica from a snapshot of the database. With --serve,
+    answer the name searches of reservation.py at the replica address;
+    otherwise answer reservation lookups until an empty name is entered,
+    suggesting similar names when there is no exact match.
+    """
+
+    parser: ArgumentParser = ArgumentParser(
+        description="Answer reservation lookups from a read-only replica."
+    )
+    parser.add_argument(
+        "--serve", action="store_true",
+        help="answer the name searches of reservation.py instead of "
+        "prompting for names",
+    )
+    arguments = parser.parse_args()
+
+    replica: ReservationReplica = ReservationReplica()
+    print(f"Replica ready with {len(replica)} reservations.")
+    if arguments.serve:
+        with Listener(Reservation._replica_address) as listener:
+            print(f"Serving name searches at {listener.address}.")
+            replica.serve(listener)
+        return
+    while name := input("Enter the name of the reservation: "):
+        try:
+            reservation: dict | None = replica.lookup(validate_name(name))
+        except ValueError:
+            reservation: dict | None = None
+        if reservation is not None:
+            print(_format_reservation(reservation))
+        elif suggestions := replica.search(name):
+            print("There is no reservation with that name. Did you mean:")
+            for suggestion in suggestions:
+                print(f"- {_format_reservation(suggestion)}")
+        else:
+            print("There is no reservation with that name.")
+        print(f"Replica lag: {replica.lag} events.")
+
+
+def _format_reservation(reservation: dict) -> str:
+    """Return a string with the details of a reservation.
+
+    :param reservation: A reservation as a dictionary.
+    :type reservation: dict
+    :return: A string with the name, people, date, time and duration
+    of the reservation.
+    :rtype: str
+    """
+
+    return (
+        f"Reservation for {reservation["people"]} people "
+        f"in the name of {reservation["name"]} "
+        f"for {reservation["date"]} at {reservation["time"]}"
+        + (
+            f" for {reservation["duration"]} minutes."
+            if "duration" in reservation else "."
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,27 @@ from __future__ import annotations
 # Standard library imports
 from re import search, IGNORECASE
 from datetime import datetime, date, time
-from json import dumps, load
+from json import dumps, load, loads, JSONDecoder, JSONDecodeError
+from csv import DictWriter
+from bisect import bisect_left
+from itertools import dropwhile, takewhile
+from math import ceil
+from os import fstat, remove, replace, stat, stat_result
+from os.path import abspath, dirname
+from tempfile import mkstemp
+from fcntl import flock, LOCK_EX
+from hashlib import sha256
+from threading import Lock
+from multiprocessing.connection import Client
+from typing import Callable, Iterator, TextIO
 
 # Third-party imports
 from fpdf import FPDF, enums
 
+# Local imports
+from idempotency_cache import IdempotencyCache
+from interval_index import IntervalIndex
+
 
 class Reservation:
     """A class used to represent a restaurant reservation.
@@ -20,9 +36,38 @@ class Reservation:
     :vartype: int
     :cvar _restaurant_capacity: The maximum number of customers.
     :vartype: int
-    :cvar _reservation_slots: The predefined time slots when
-    reservations can be made.
+    :cvar _seating_hours: The first and last times, both included, at
+    which reservations can start in each service.
+    :vartype: list
+    :cvar _default_duration: The minutes a reservation lasts unless
+    stated otherwise.
+    :vartype: int
+    :cvar _database_path: The JSON file used as the database.
+    :vartype: str
+    :cvar _database_fields: The fields stored for each reservation, in
+    the order they are exported.
     :vartype: list
+    :cvar _database_index: The file that maps each date to the position
+    of its first reservation in the database.
+    :vartype: str
+    :cvar _change_log: The JSON Lines file where every change to the
+    database is appended as a sequenced event.
+    :vartype: str
+    :cvar _idempotency_journal: The file where the results of the
+    requests made with an idempotency key are kept.
+    :vartype: str
+    :cvar _idempotency_caches: The idempotency cache of each journal
+    file, created when first used.
+    :vartype: dict
+    :cvar _idempotency_lock: The lock that makes sure a single
+    idempotency cache is created for each journal file.
+    :vartype: Lock
+    :cvar _tables_schedules: The state of each database file and the
+    schedule of each of its dates, as an interval index once used.
+    :vartype: dict
+    :cvar _replica_address: The address where a replica answers the
+    searches of similar names.
+    :vartype: tuple
 
     **Attributes**
     :attr _name: The name of the person making the reservation.
@@ -33,6 +78,8 @@ class Reservation:
     :type _time: time
     :attr _people: The number of people who will attend.
     :type _people: int
+    :attr _duration: The minutes the reservation lasts.
+    :type _duration: int
 
     **Public methods**
     :meth create_reservation: Creates a new reservation and stores it
@@ -43,18 +90,29 @@ class Reservation:
     stored in the database.
     :meth delete_reservation: Deletes a reservation stored in the
     database.
+    :meth display_manifest: Displays every reservation of a service.
+    :meth export_reservations: Exports the reservations of a period of
+    dates to a CSV or JSONL file.
     """
 
     # Class variables
     _restaurant_tables: int = 4
     _tables_capacity: int = 4
     _restaurant_capacity: int = 16
-    _reservation_slots: list = [
-        time(12, 0),
-        time(14, 0),
-        time(20, 0),
-        time(22, 0),
+    _seating_hours: list = [
+        (time(12, 0), time(15, 0)),
+        (time(20, 0), time(22, 0)),
     ]
+    _default_duration: int = 120
+    _database_path: str = "reservation_database.json"
+    _database_fields: list = ["name", "date", "time", "people", "duration"]
+    _database_index: str = "reservation_database_index.json"
+    _change_log: str = "reservation_changes.jsonl"
+    _idempotency_journal: str = "reservation_idempotency.jsonl"
+    _idempotency_caches: dict = {}
+    _idempotency_lock: Lock = Lock()
+    _tables_schedules: dict = {}
+    _replica_address: tuple = ("localhost", 6010)
 
 
     # Special methods
@@ -63,7 +121,8 @@ class Reservation:
             rname: str,
             rdate: str = "1-1-3000",
             rtime: str = "12:00",
-            rpeople: str = "0"
+            rpeople: str = "0",
+            rduration: str = "120"
     ) -> None:
         """Initialize a Reservation object.
 
@@ -76,12 +135,16 @@ class Reservation:
         :param rpeople: The number of people who will attend
         (default "0").
         :type rpeople: str
+        :param rduration: The minutes the reservation lasts
+        (default "120").
+        :type rduration: str
         """
 
         self._name: str = rname
         self._date: date = rdate
         self._time: time = rtime
         self._people: int = rpeople
+        self._duration: int = rduration
 
     def __str__(self) -> str:
         """Return a string representation of a Reservation instance.
@@ -95,7 +158,8 @@ class Reservation:
             f"Reservation for {self._people} people "
             f"in the name of {self._name} "
             f"for {self._date.strftime("%A, %d %B, %Y")} "
-            f"at {self._time.strftime("%I %p")}."
+            f"at {self._time.strftime("%I:%M %p")} "
+            f"for {self._duration} minutes."
         )
 
 
@@ -223,6 +287,54 @@ class Reservation:
                 continue
         self._rpeople: int = validated_people
 
+    @property
+    def _duration(self) -> int:
+        """Get the minutes the reservation lasts.
+
+        :return: The minutes the reservation lasts.
+        :rtype: int
+        """
+
+        return self._rduration
+
+    @_duration.setter
+    def _duration(self, duration: str) -> None:
+        """Set the duration attribute value of the reservation.
+
+        :param duration: The duration attribute of the Reservation
+        instance.
+        :type duration: str
+        """
+
+        while True:
+            try:
+                validated_duration: int = validate_duration(duration)
+                break
+            except (ValueError, AttributeError):
+                duration: str = input(
+                    "Invalid duration. "
+                    "Please, re-enter the duration in minutes "
+                    "(a number between 30 and 240): "
+                )
+                continue
+        self._rduration: int = validated_duration
+
+    def _as_record(self) -> dict:
+        """Return the reservation as it is stored in the database.
+
+        :return: A dictionary with the name, date, time, people and
+        duration of the reservation.
+        :rtype: dict
+        """
+
+        return {
+            "name": self._name,
+            "date": self._date.strftime("%Y-%m-%d"),
+            "time": self._time.strftime("%H:%M"),
+            "people": self._people,
+            "duration": self._duration,
+        }
+
 
     # CRUD reservation methods
     @classmethod
@@ -249,13 +361,14 @@ class Reservation:
         reservation._time = cls._request_time()
         print(cls._get_people_constraints())
         reservation._people = cls._request_people()
-        if not cls._check_reservation_availability(reservation):
+        print(cls._get_duration_constraints())
+        reservation._duration = cls._request_duration()
+        # Update database and confirmation
+        if not cls._book_reservation(reservation):
             exit(
                 "Sorry, we do not have availability "
                 "for the data you have provided."
             )
-        # Update database and confirmation
-        cls.__update_database(reservation)
         cls._create_confirmation_document(reservation)
         print(
             "Reservation confirmed! You will shortly receive a "
@@ -269,22 +382,27 @@ class Reservation:
         This method prompts the user for a name and creates and object
         with it and its default values. If there is not a reservation in
         the database associated with that name, it prints a no
-        reservation message. Otherwise, it gets the details from
-        the reservation, updates the object with them and prints it.
+        reservation message and the names of the reservations most
+        similar to it. Otherwise, it gets the details from the
+        reservation, updates the object with them and prints it.
         """
 
         # Get name from user and check if exists in database
         reservation: Reservation = cls(cls._request_name())
-        if cls._check_name_availability(reservation):
-            print("There is no reservation with that name.")
+        database_reservation: dict | None = cls._find_reservation(
+            reservation._name
+        )
+        if database_reservation is None:
+            cls._print_similar_names(reservation._name)
         else:
             # Update object data and print it
-            for database_reservation in cls.__get_reservations():
-                if reservation._name == database_reservation["name"]:
-                    year, month, day = database_reservation["date"].split("-")
-                    reservation._date = f"{day}-{month}-{year}"
-                    reservation._time = database_reservation["time"]
-                    reservation._people = str(database_reservation["people"])
+            year, month, day = database_reservation["date"].split("-")
+            reservation._date = f"{day}-{month}-{year}"
+            reservation._time = database_reservation["time"]
+            reservation._people = str(database_reservation["people"])
+            reservation._duration = str(
+                database_reservation.get("duration", cls._default_duration)
+            )
             print(reservation)
 
     @classmethod
@@ -304,38 +422,257 @@ class Reservation:
 
     @classmethod
     def cancel_reservation(cls) -> None:
-        """
-        Remove a reservation stored in the database.
+        """Remove a reservation stored in the database.
 
-        ...
+        This method prompts the user for a name and, if there is a
+        reservation in the database associated with that name, removes
+        it and prints a confirmation message. Otherwise, it prints a no
+        reservation message and the names of the reservations most
+        similar to it.
         """
 
-        # TODO: Refactor method
-
-        # Get name from user and check if exists in database
+        # Get name from user and remove its reservation if it exists
         user_reservation: Reservation = cls(cls._request_name())
-        if cls._check_name_availability(user_reservation):
-            print("There is no reservation with that name.")
+        if not cls._remove_reservation(user_reservation._name):
+            cls._print_similar_names(user_reservation._name)
         else:
-            # Get list of database reservations
-            database_reservations: list = cls.__get_reservations()
-            # Create a new list without the previous user reservation
-            updated_reservations: list = [
-                reservation for reservation in database_reservations
-                if reservation["name"] != user_reservation._name
-            ]
-            # Create a dictionary with numbered reservations
-            numbered_reservations: dict = {
-                str(i + 1): 
-                    reservation for i, reservation
-                    in enumerate(updated_reservations)
-            }
-            # Write the updated reservations back to the JSON file
-            with open("reservation_database.json", "w") as database:
-                database.write(dumps(numbered_reservations, indent=4))
             # Confirmation
             print("Your reservation has been cancelled.")
 
+    @classmethod
+    def display_manifest(cls) -> None:
+        """Display every reservation of a service.
+
+        This method prompts the user for the date and time of a
+        service and prints the reservations that are seated at that
+        time, in the order they start, followed by the total number of
+        people expected and the tables in use.
+        """
+
+        service_date: date = cls._request_any_date(
+            "Enter the date of the service (dd-mm-yyyy): "
+        )
+        service_time: time = cls._request_any_time(
+            "Enter the time of the service (hh:mm, 24h format): "
+        )
+        instant: int = service_time.hour * 60 + service_time.minute
+        schedule: IntervalIndex = cls._get_tables_schedule(service_date)
+        people: int = 0
+        for start, end, _, name, reservation_people in schedule.containing(
+            instant
+        ):
+            print(
+                f"{start // 60:02}:{start % 60:02}  {name}, "
+                f"{reservation_people} people, {end - start} minutes"
+            )
+            people += reservation_people
+        print(
+            f"Total people expected: {people}. "
+            f"Tables in use: {schedule.load_at(instant)} "
+            f"of {cls._restaurant_tables}."
+        )
+
+    @classmethod
+    def export_reservations(cls) -> None:
+        """Export the reservations of a period of dates to a file.
+
+        This method prompts the user for the output format, the first
+        and last dates of the period and the file name, and writes the
+        reservations to that file one by one.
+        """
+
+        while (
+            file_format := input("Enter the export format (csv/jsonl): ")
+            .strip().lower()
+        ) not in ("csv", "jsonl"):
+            print("Invalid format.")
+        start: date = cls._request_any_date(
+            "Enter the first date to export (dd-mm-yyyy): "
+        )
+        end: date = cls._request_any_date(
+            "Enter the last date to export (dd-mm-yyyy): "
+        )
+        filename: str = input("Enter the name of the export file: ")
+        with open(filename, "w", newline="") as output:
+            exported: int = cls._export_reservations(
+                output, file_format, start, end
+            )
+        print(f"{exported} reservations exported to {filename}.")
+
+
+    # Non-interactive CRUD methods
+    @classmethod
+    def _book_reservation(
+        cls, reservation: Reservation, idempotency_key: str | None = None
+    ) -> bool:
+        """Store a reservation in the database if both its name and
+        the restaurant are available.
+
+        :param reservation: A reservation object with the details of
+        the new reservation.
+        :type reservation: Reservation
+        :param idempotency_key: A key identifying the request, so that
+        retrying it returns the first result without booking again
+        (default None).
+        :type idempotency_key: str | None
+        :return: True if the reservation was stored, False otherwise.
+        :rtype: bool
+        """
+
+        if idempotency_key is not None:
+            return cls.__run_once(
+                f"create:{idempotency_key}",
+                reservation._as_record(),
+                lambda: cls._book_reservation(reservation),
+            )
+        if not (
+            cls._check_name_availability(reservation)
+            and cls._check_reservation_availability(reservation)
+        ):
+            return False
+        cls.__update_database(reservation._as_record())
+        return True
+
+    @classmethod
+    def _find_reservation(cls, name: str) -> dict | None:
+        """Find the reservation stored in the database with a name.
+
+        :param name: The validated name of the reservation.
+        :type name: str
+        :return: The reservation as a dictionary, or None if there is
+        no reservation with that name.
+        :rtype: dict | None
+        """
+
+        for reservation in cls._iter_reservations():
+            if reservation["name"] == name:
+                return reservation
+        return None
+
+    @classmethod
+    def _change_reservation(
+        cls,
+        name: str,
+        reservation: Reservation,
+        idempotency_key: str | None = None,
+    ) -> bool:
+        """Replace the reservation stored with a name by a new one.
+
+        The previous reservation is removed before checking the
+        availability for the new one, and restored if there is none or
+        the new one cannot be stored.
+
+        :param name: The validated name of the reservation to replace.
+        :type name: str
+        :param reservation: A reservation object with the new details.
+        :type reservation: Reservation
+        :param idempotency_key: A key identifying the request, so that
+        retrying it returns the first result without replacing the
+        reservation again (default None).
+        :type idempotency_key: str | None
+        :return: True if the reservation was replaced, False otherwise.
+        :rtype: bool
+        """
+
+        if idempotency_key is not None:
+            return cls.__run_once(
+                f"update:{idempotency_key}",
+                [name, reservation._as_record()],
+                lambda: cls._change_reservation(name, reservation),
+            )
+        previous_reservation: dict | None = cls._find_reservation(name)
+        if previous_reservation is None or not cls._remove_reservation(name):
+            return False
+        booked: bool = False
+        try:
+            booked = cls._book_reservation(reservation)
+        finally:
+            # Restore the previous reservation even if booking raised
+            if not booked:
+                cls.__update_database(previous_reservation)
+        return booked
+
+    @classmethod
+    def _remove_reservation(
+        cls, name: str, idempotency_key: str | None = None
+    ) -> bool:
+        """Remove the reservation stored in the database with a name.
+
+        :param name: The validated name of the reservation.
+        :type name: str
+        :param idempotency_key: A key identifying the request, so that
+        retrying it returns the first result without removing the
+        reservation again (default None).
+        :type idempotency_key: str | None
+        :return: True if the reservation was removed, False if there
+        was no reservation with that name.
+        :rtype: bool
+        """
+
+        if idempotency_key is not None:
+            return cls.__run_once(
+                f"cancel:{idempotency_key}",
+                name,
+                lambda: cls._remove_reservation(name),
+            )
+        # Create a new list without the reservation with that name
+        database_reservations: list = cls.__get_reservations()
+        updated_reservations: list = [
+            reservation for reservation in database_reservations
+            if reservation["name"] != name
+        ]
+        if len(updated_reservations) == len(database_reservations):
+            return False
+        # Write the updated reservations back to the JSON file
+        cls.__write_database(updated_reservations)
+        for reservation in database_reservations:
+            if reservation["name"] == name:
+                cls.__append_change("cancel", reservation)
+        return True
+
+    @classmethod
+    def __run_once(
+        cls, key: str, details: object, request: Callable[[], bool]
+    ) -> bool:
+        """Run a request unless a request with the same key has
+        already run, and return its result.
+
+        The results are kept in the idempotency cache along with a
+        fingerprint of the details of the request, so a retried request
+        is answered without checking the availability or writing the
+        database again, and a key reused for a different request is
+        rejected. A request sent again while the first one is still
+        running waits for its result.
+
+        :param key: The operation and idempotency key of the request.
+        :type key: str
+        :param details: The details of the request, serializable to
+        JSON.
+        :type details: object
+        :param request: The function that runs the request.
+        :type request: Callable[[], bool]
+        :return: The result of the request.
+        :rtype: bool
+        :raise ValueError: If the key was used for a request with
+        different details.
+        """
+
+        with cls._idempotency_lock:
+            if cls._idempotency_journal not in cls._idempotency_caches:
+                cls._idempotency_caches[cls._idempotency_journal] = (
+                    IdempotencyCache(cls._idempotency_journal)
+                )
+            cache: IdempotencyCache = cls._idempotency_caches[
+                cls._idempotency_journal
+            ]
+        fingerprint: str = sha256(
+            dumps(details, sort_keys=True).encode()
+        ).hexdigest()
+        entry: list = cache.run_once(key, lambda: [fingerprint, request()])
+        if entry[0] != fingerprint:
+            raise ValueError("Idempotency key used for another request")
+        return entry[1]
+
 
     # Request methods
     @staticmethod
@@ -379,6 +716,56 @@ class Reservation:
 
         return input("Enter the number of people attending: ")
 
+    @classmethod
+    def _request_duration(cls) -> str:
+        """Request the user to input the minutes the reservation lasts.
+
+        :return: The reservation duration entered by the user, or the
+        default duration if nothing was entered.
+        :rtype: str
+        """
+
+        return (
+            input(
+                "Enter the duration of the reservation in minutes "
+                f"(press enter for {cls._default_duration}): "
+            )
+            or str(cls._default_duration)
+        )
+
+    @staticmethod
+    def _request_any_date(message: str) -> date:
+        """Request the user to input a date, past or future.
+
+        :param message: The message displayed to the user.
+        :type message: str
+        :return: The date entered by the user.
+        :rtype: date
+        """
+
+        while True:
+            try:
+                return datetime.strptime(input(message), "%d-%m-%Y").date()
+            except ValueError:
+                print("Invalid date.")
+
+    @staticmethod
+    def _request_any_time(message: str) -> time:
+        """Request the user to input a time, in or out of the
+        reservation slots.
+
+        :param message: The message displayed to the user.
+        :type message: str
+        :return: The time entered by the user.
+        :rtype: time
+        """
+
+        while True:
+            try:
+                return datetime.strptime(input(message), "%H:%M").time()
+            except ValueError:
+                print("Invalid time.")
+
 
     # Check availability in the database
     @classmethod
@@ -408,9 +795,9 @@ class Reservation:
         """Check if a reservation can be made based on the restaurant's
         current availability.
 
-        This method verifies the availability of tables for the
-        specified date, time and number of people, and ensures the
-        reservation request aligns with capacity constraints.
+        This method verifies that, at every instant between the start
+        and the end of the reservation, the tables already in use that
+        day leave enough free tables for the number of people.
 
         :param user_reservation: An instance of the Reservation class
         containing reservation details.
@@ -420,35 +807,76 @@ class Reservation:
         :rtype: bool
         """
 
-        # TODO: refactor this and add comments
-        database_reservations: list = cls.__get_reservations()
-        tables_available: int = cls._restaurant_tables
-        for database_reservation in database_reservations:
-            if(
-                database_reservation["date"]
-                == user_reservation._date.strftime("%Y-%m-%d")
-            ):
-                if(
-                    database_reservation["time"]
-                    == user_reservation._time.strftime("%H:%M")
-                ):
-                    match database_reservation["people"]:
-                        case 1 | 2 | 3 | 4:
-                            tables_available -= 1
-                        case 5 | 6 | 7 | 8:
-                            tables_available -= 2
-                        case 9 | 10 | 11 | 12:
-                            tables_available -= 3
-                        case 13 | 14 | 15 | 16:
-                            tables_available -= 4
-        return(
-            False if(
-                tables_available == 0
-                or (user_reservation._people
-                    / tables_available > cls._tables_capacity)
-                or user_reservation._people / tables_available < 0
+        start, end, tables = cls._get_interval(user_reservation._as_record())
+        tables_in_use: int = cls._get_tables_schedule(
+            user_reservation._date
+        ).peak_load(start, end)
+        return tables_in_use + tables <= cls._restaurant_tables
+
+    @classmethod
+    def _get_tables_schedule(cls, rdate: date) -> IntervalIndex:
+        """Get the tables used by the reservations of a date over time.
+
+        The interval index of a date is built the first time it is used
+        from the reservations of that date alone, read through the date
+        index, and kept in memory until the database changes.
+
+        :param rdate: The date of the reservations.
+        :type rdate: date
+        :return: An interval index with the minutes each reservation of
+        the date lasts, the tables it takes, and its name and people.
+        :rtype: IntervalIndex
+        """
+
+        state: list = cls.__get_database_state()
+        cached: tuple | None = cls._tables_schedules.get(cls._database_path)
+        if cached is None or cached[0] != state:
+            cached = (state, {})
+            cls._tables_schedules[cls._database_path] = cached
+        schedules: dict = cached[1]
+        key: str = rdate.strftime("%Y-%m-%d")
+        if key not in schedules:
+            schedules[key] = IntervalIndex(
+                tuple(cls._get_schedule_interval(reservation))
+                for reservation in cls._iter_reservations(rdate, rdate)
             )
-            else True
+        return schedules[key]
+
+    @classmethod
+    def _get_schedule_interval(cls, reservation: dict) -> list:
+        """Get the interval of a reservation in the schedule of its
+        date.
+
+        :param reservation: A reservation as a dictionary.
+        :type reservation: dict
+        :return: The start, end and tables of the reservation, as
+        returned by _get_interval, followed by its name and people.
+        :rtype: list
+        """
+
+        return [
+            *cls._get_interval(reservation),
+            reservation["name"],
+            reservation["people"],
+        ]
+
+    @classmethod
+    def _get_interval(cls, reservation: dict) -> tuple:
+        """Get the minutes a reservation lasts and the tables it takes.
+
+        :param reservation: A reservation as a dictionary.
+        :type reservation: dict
+        :return: The start and end of the reservation, in minutes since
+        midnight, and the number of tables it takes.
+        :rtype: tuple
+        """
+
+        hours, minutes = reservation["time"].split(":")
+        start: int = int(hours) * 60 + int(minutes)
+        return (
+            start,
+            start + reservation.get("duration", cls._default_duration),
+            ceil(reservation["people"] / cls._tables_capacity),
         )
 
 
@@ -474,8 +902,12 @@ class Reservation:
         """
 
         return(
-            "Time slots for reservations: "
-            + ", ".join(t.strftime("%H:%M") for t in cls._reservation_slots)
+            "Reservations can start between "
+            + " or ".join(
+                f"{first.strftime("%H:%M")} and {last.strftime("%H:%M")}"
+                for first, last in cls._seating_hours
+            )
+            + "."
         )
 
     @classmethod
@@ -488,13 +920,28 @@ class Reservation:
         """
 
         return(
-            "Maximum capacity of the restaurant by time slots: "
+            "Maximum capacity of the restaurant at any time: "
             f"{cls._restaurant_capacity}, "
             f"{cls._restaurant_tables} tables of "
             f"{cls._tables_capacity} people each."
         )
 
 
+    @classmethod
+    def _get_duration_constraints(cls) -> str:
+        """Return a message explaining the duration constraints for
+        reservations.
+
+        :return: A string describing the duration constraints.
+        :rtype: str
+        """
+
+        return (
+            "Reservations last between 30 and 240 minutes, "
+            f"{cls._default_duration} by default."
+        )
+
+
     # Other methods
     @staticmethod
     def _create_confirmation_document(reservation) -> None:
@@ -532,46 +979,338 @@ class Reservation:
         pdf.output("reservation.pdf")
 
     @classmethod
-    def __update_database(cls, user_reservation: Reservation) -> None:
+    def _print_similar_names(cls, name: str) -> None:
+        """Print a no reservation message with the names of the
+        reservations most similar to a name, if there are any.
+
+        The names are searched by the replica listening at the replica
+        address, which keeps its name index in memory. If no replica
+        is listening, only the message is printed.
+
+        :param name: The validated name with no reservation.
+        :type name: str
+        """
+
+        try:
+            with Client(cls._replica_address) as replica:
+                replica.send_bytes(name.encode())
+                suggestions: list = loads(replica.recv_bytes())
+        except (OSError, EOFError):
+            suggestions: list = []
+        if suggestions:
+            print("There is no reservation with that name. Did you mean:")
+            for suggestion in suggestions:
+                print(f"- {suggestion}")
+        else:
+            print("There is no reservation with that name.")
+
+    @classmethod
+    def __update_database(cls, user_reservation: dict) -> None:
         """Update the database to include a new reservation.
 
         The database is stored in a JSON file. The new reservation is
         added, and the reservations are sorted by date and time before
         saving.
 
-        :param user_reservation: A reservation object with the details
-        of the new reservation.
-        :type user_reservation: Reservation
+        :param user_reservation: The new reservation as a dictionary.
+        :type user_reservation: dict
         """
 
         # Load the current reservations from the database
         reservations_database: list = cls.__get_reservations()
-        # Add the new reservation as a dictionary
-        reservations_database.append(
-            {
-                "name": user_reservation._name,
-                "date": user_reservation._date.strftime("%Y-%m-%d"),
-                "time": user_reservation._time.strftime("%H:%M"),
-                "people": user_reservation._people,
-            }
-        )
+        # Add the new reservation
+        reservations_database.append(user_reservation)
         # Sort reservations by date, then by time
         sorted_reservations: list = sorted(
             reservations_database,
             key=lambda item: (item["date"], item["time"]),
         )
-        # Create a dictionary with numbered reservations
-        numbered_reservations: dict = {
-            str(i + 1): 
-                reservation for i, reservation
-                in enumerate(sorted_reservations)
-        }
         # Write the updated reservations back to the JSON file
-        with open("reservation_database.json", "w") as database:
-            database.write(dumps(numbered_reservations, indent=4))
+        cls.__write_database(sorted_reservations)
+        cls.__append_change("create", user_reservation)
 
-    @staticmethod
-    def __get_reservations() -> list:
+    @classmethod
+    def __write_database(cls, reservations: list) -> None:
+        """Write a list of reservations to the JSON file database.
+
+        The reservations are stored as a dictionary of numbered
+        reservations, written one at a time so that the position of
+        the first reservation of each date can be saved in the date
+        index. They are written to a temporary file that then replaces
+        the database, so readers never find it half written.
+
+        :param reservations: A list of reservations sorted by date and
+        time, where each reservation is represented as a dictionary.
+        :type reservations: list
+        """
+
+        index: dict = {}
+        # Only the schedules already in memory are kept up to date
+        cached: tuple = cls._tables_schedules.get(
+            cls._database_path, (None, {})
+        )
+        schedules: dict = {key: [] for key in cached[1]}
+        descriptor, temporary_path = mkstemp(
+            suffix=".tmp", dir=dirname(abspath(cls._database_path))
+        )
+        try:
+            with open(descriptor, "w") as database:
+                database.write("{")
+                for number, reservation in enumerate(reservations, start=1):
+                    database.write("," if number > 1 else "")
+                    database.write("\n    ")
+                    if reservation["date"] not in index:
+                        index[reservation["date"]] = database.tell()
+                    if reservation["date"] in schedules:
+                        schedules[reservation["date"]].append(
+                            tuple(cls._get_schedule_interval(reservation))
+                        )
+                    database.write(
+                        f"{dumps(str(number))}: "
+                        + dumps(reservation, indent=4).replace(
+                            "\n", "\n    "
+                        )
+                    )
+                database.write("\n}" if reservations else "}")
+                database.flush()
+                # Renaming the file keeps its size and modification time
+                state: list = cls.__get_database_state(database)
+            replace(temporary_path, cls._database_path)
+        except BaseException:
+            remove(temporary_path)
+            raise
+        # Save the index along with the state of the database it refers
+        # to
+        with open(cls._database_index, "w") as database_index:
+            database_index.write(dumps({"state": state, "dates": index}))
+        cls._tables_schedules[cls._database_path] = (state, {
+            key: IntervalIndex(intervals)
+            for key, intervals in schedules.items()
+        })
+
+    @classmethod
+    def _export_reservations(
+        cls, output: TextIO, file_format: str, start: date, end: date
+    ) -> int:
+        """Write the reservations between two dates to an output stream.
+
+        The reservations are streamed from the database and written one
+        by one, so the memory used does not depend on the number of
+        reservations exported.
+
+        :param output: The text stream the reservations are written to.
+        :type output: TextIO
+        :param file_format: The output format, "csv" or "jsonl".
+        :type file_format: str
+        :param start: The first date to export.
+        :type start: date
+        :param end: The last date to export.
+        :type end: date
+        :return: The number of reservations exported.
+        :rtype: int
+        :raise ValueError: If file_format is not "csv" or "jsonl".
+        """
+
+        exported: int = 0
+        match file_format:
+            case "csv":
+                writer: DictWriter = DictWriter(
+                    output, fieldnames=cls._database_fields,
+                    extrasaction="ignore",
+                )
+                writer.writeheader()
+                for reservation in cls._iter_reservations(start, end):
+                    writer.writerow(reservation)
+                    exported += 1
+            case "jsonl":
+                for reservation in cls._iter_reservations(start, end):
+                    output.write(dumps(reservation) + "\n")
+                    exported += 1
+            case _:
+                raise ValueError("Export format not valid")
+        return exported
+
+    @classmethod
+    def _iter_reservations(
+        cls, start: date | None = None, end: date | None = None
+    ) -> Iterator[dict]:
+        """Yield the reservations stored in the database between two
+        dates, in date and time order.
+
+        The database is read incrementally instead of being loaded as a
+        whole. If the date index is up to date, reading starts at the
+        first reservation on or after the start date; otherwise the
+        reservations before it are skipped. Reading stops at the first
+        reservation after the end date.
+
+        :param start: The first date to yield (default the first date
+        in the database).
+        :type start: date | None
+        :param end: The last date to yield (default the last date in
+        the database).
+        :type end: date | None
+        :return: An iterator over the reservations, where each
+        reservation is represented as a dictionary.
+        :rtype: Iterator[dict]
+        """
+
+        first: str = start.strftime("%Y-%m-%d") if start else ""
+        last: str | None = end.strftime("%Y-%m-%d") if end else None
+        with open(cls._database_path, "r") as database:
+            offset: int | None = cls.__find_date_offset(first, database)
+            if offset is not None:
+                database.seek(offset)
+            reservations: Iterator[dict] = dropwhile(
+                lambda reservation: reservation["date"] < first,
+                (
+                    reservation for _, reservation
+                    in stream_json_object(database, offset is not None)
+                ),
+            )
+            if last is not None:
+                reservations = takewhile(
+                    lambda reservation: reservation["date"] <= last,
+                    reservations,
+                )
+            yield from reservations
+
+    @classmethod
+    def __find_date_offset(cls, rdate: str, database: TextIO) -> int | None:
+        """Find the position in the database of the first reservation
+        on or after a date.
+
+        :param rdate: The date in "yyyy-mm-dd" format.
+        :type rdate: str
+        :param database: The open database file the position is for.
+        :type database: TextIO
+        :return: The position of the reservation, or None if the date
+        index is missing, out of date or has no reservation on or
+        after that date.
+        :rtype: int | None
+        """
+
+        try:
+            with open(cls._database_index, "r") as database_index:
+                index: dict = load(database_index)
+        except (FileNotFoundError, JSONDecodeError):
+            return None
+        if index.get("state") != cls.__get_database_state(database):
+            return None
+        dates: list = list(index["dates"])
+        position: int = bisect_left(dates, rdate)
+        if position == len(dates):
+            return None
+        return index["dates"][dates[position]]
+
+    @classmethod
+    def __get_database_state(cls, database: TextIO | None = None) -> list:
+        """Get the size and modification time of the database, which
+        change each time it is written.
+
+        :param database: An open database file, whose state is returned
+        even if the database has been replaced since it was opened
+        (default the current database file).
+        :type database: TextIO | None
+        :return: The size in bytes and the modification time in
+        nanoseconds of the database file.
+        :rtype: list
+        """
+
+        database_stat: stat_result = (
+            stat(cls._database_path) if database is None
+            else fstat(database.fileno())
+        )
+        return [database_stat.st_size, database_stat.st_mtime_ns]
+
+    @classmethod
+    def __append_change(cls, operation: str, reservation: dict) -> None:
+        """Append a change event to the change log.
+
+        Each event is written as a line of JSON with the next sequence
+        number, so that read-only replicas can follow the changes made
+        to the database without reading it. The log is locked while the
+        last sequence number is read and the event appended, so
+        concurrent writers never share a sequence number.
+
+        :param operation: The change made, "create" or "cancel".
+        :type operation: str
+        :param reservation: The reservation created or cancelled, as a
+        dictionary.
+        :type reservation: dict
+        """
+
+        with open(cls._change_log, "a") as change_log:
+            # The lock is released when the file is closed
+            flock(change_log, LOCK_EX)
+            sequence, _ = cls._get_change_log_position()
+            change_log.write(
+                dumps({
+                    "sequence": sequence + 1,
+                    "operation": operation,
+                    "reservation": reservation,
+                })
+                + "\n"
+            )
+
+    @classmethod
+    def _get_change_log_position(cls) -> tuple:
+        """Get the sequence number of the last event in the change log
+        and the position where the next one starts.
+
+        The log is read backwards from its end, so the time taken does
+        not depend on the number of events. A last line that is still
+        being written is ignored.
+
+        :return: The sequence number of the last complete event (0 if
+        there is none) and the position in bytes right after it.
+        :rtype: tuple
+        """
+
+        try:
+            with open(cls._change_log, "rb") as change_log:
+                end: int = change_log.seek(0, 2)
+                block: int = 4096
+                while True:
+                    start: int = max(0, end - block)
+                    change_log.seek(start)
+                    tail: bytes = change_log.read(end - start)
+                    line_end: int = tail.rfind(b"\n")
+                    if line_end == -1 and start == 0:
+                        return 0, 0
+                    line_start: int = tail.rfind(b"\n", 0, line_end) + 1
+                    # Read a bigger block if the last line is cut off
+                    if line_end == -1 or (line_start == 0 and start > 0):
+                        block *= 2
+                        continue
+                    event: dict = loads(tail[line_start:line_end])
+                    return event["sequence"], start + line_end + 1
+        except FileNotFoundError:
+            return 0, 0
+
+    @classmethod
+    def _take_snapshot(cls) -> dict:
+        """Take a snapshot of the database to bootstrap a replica.
+
+        The position in the change log is read before the database, so
+        any change made while the snapshot is taken is also in the log
+        after that position. Replaying those events on top of the
+        snapshot gives the current state, since creating or cancelling
+        a reservation twice has the same result as doing it once.
+
+        :return: A dictionary with the sequence number and position of
+        the last change log event and the list of reservations.
+        :rtype: dict
+        """
+
+        sequence, position = cls._get_change_log_position()
+        return {
+            "sequence": sequence,
+            "position": position,
+            "reservations": list(cls._iter_reservations()),
+        }
+
+    @classmethod
+    def __get_reservations(cls) -> list:
         """Retrieve all reservations from the JSON file database.
 
         :return: A list of reservations, where each reservation is
@@ -579,7 +1318,7 @@ class Reservation:
         :rtype: list
         """
 
-        with open("reservation_database.json", "r") as database:
+        with open(cls._database_path, "r") as database:
             database_dict: dict = load(database)
         return list(database_dict.values())
 
@@ -597,12 +1336,14 @@ def main():
             "\nWelcome to our restaurant! "
             "How can we help you?\n"
             "(Please select one of the options "
-            "by typing 'a', 'b', 'c', 'd' or 'e' and press enter):\n"
+            "by typing 'a', 'b', 'c', 'd', 'e', 'f' or 'g' and press enter):\n"
             "a. Create a new reservation.\n"
             "b. Show my reservation details.\n"
             "c. Update my reservation details.\n"
             "d. Cancel my reservation.\n"
-            "e. Exit.\n"
+            "e. Show the manifest of a service.\n"
+            "f. Export reservations.\n"
+            "g. Exit.\n"
             ": "
         ).lower()
     ):
@@ -615,6 +1356,10 @@ def main():
         case "d":
             Reservation.cancel_reservation()
         case "e":
+            Reservation.display_manifest()
+        case "f":
+            Reservation.export_reservations()
+        case "g":
             pass
         case _:
             print("The option entered is not correct")
@@ -677,18 +1422,22 @@ def validate_time(rdate: date, rtime: str) -> time:
     :rtype: time
     :raise ValueError: If the date and time are in the past.
     :raise AttributeError: If rtime isn't in the correct "xx:xx"
-    colon format or does not match the restaurant allowed time slots.
+    colon format or is outside the restaurant seating hours.
     """
 
     current_date: date = datetime.today().date()
     current_time: time = datetime.today().time()
-    # TODO: Replace hardcode. Use _reservation_slots
-    reservation_time: str = search(r"^(12|14|20|22):(00)$", rtime)
+    reservation_time: str = search(r"^([01]?\d|2[0-3]):([0-5]\d)$", rtime)
     validated_time: time = time(
         hour=int(reservation_time.group(1)),
         minute=int(reservation_time.group(2)),
     )
-    if rdate <= current_date:
+    if not any(
+        first <= validated_time <= last
+        for first, last in Reservation._seating_hours
+    ):
+        raise AttributeError("The time entered is outside seating hours")
+    elif rdate <= current_date:
         raise ValueError("The date entered has already passed")
     elif rdate <= current_date and validated_time < current_time:
         raise ValueError("The time entered has already passed")
@@ -715,5 +1464,98 @@ def validate_people(people: str) -> int:
     return int(reservation_people.group(1))
 
 
+def validate_duration(duration: str) -> int:
+    """Convert and validate a number of minutes string into an integer.
+
+    The number must be between 30 and 240, both included, because this
+    method is developed to validate how long a restaurant reservation
+    lasts.
+
+    :param duration: A number string in "n" format.
+    :type duration: str
+    :return: A corresponding integer number.
+    :rtype: int
+    :raise ValueError: If duration is a number out of range.
+    :raise AttributeError: If duration's value is anything but a
+    number.
+    """
+
+    reservation_duration: int = int(
+        search(r"^(\d{1,3})$", duration).group(1)
+    )
+    if not 30 <= reservation_duration <= 240:
+        raise ValueError("Duration not valid")
+    return reservation_duration
+
+
+# Streaming functions
+def stream_json_object(
+    file: TextIO, positioned: bool = False, chunk_size: int = 65536
+) -> Iterator[tuple]:
+    """Yield the members of a JSON object read incrementally from a
+    file.
+
+    The file is read in chunks and each member is decoded as soon as it
+    is complete, so only one member is held in memory at a time.
+
+    :param file: A text file containing a JSON object.
+    :type file: TextIO
+    :param positioned: Whether the file is already positioned at the
+    key of a member of the object instead of at its opening brace
+    (default False).
+    :type positioned: bool
+    :param chunk_size: The number of characters read at a time
+    (default 65536).
+    :type chunk_size: int
+    :return: An iterator over the (key, value) pairs of the object.
+    :rtype: Iterator[tuple]
+    :raise ValueError: If the file does not contain a valid JSON
+    object.
+    """
+
+    decoder: JSONDecoder = JSONDecoder()
+    buffer: str = ""
+    position: int = 0
+    exhausted: bool = False
+    state: str = "key" if positioned else "open"
+    while True:
+        # Decode the next key or value if the buffer holds all of it
+        while position < len(buffer) and buffer[position] in " \t\n\r":
+            position += 1
+        refill: bool = position == len(buffer)
+        if not refill and (
+            state in ("key", "value")
+            or (state == "first" and buffer[position] != "}")
+        ):
+            try:
+                token, end = decoder.raw_decode(buffer, position)
+                refill = end == len(buffer) and not exhausted
+            except JSONDecodeError:
+                refill = True
+        # Otherwise read another chunk of the file
+        if refill:
+            if exhausted:
+                raise ValueError("JSON object not valid")
+            chunk: str = file.read(chunk_size)
+            exhausted = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        match state, buffer[position]:
+            case "open", "{":
+                state, position = "first", position + 1
+            case "first" | "separator", "}":
+                return
+            case "separator", ",":
+                state, position = "key", position + 1
+            case "colon", ":":
+                state, position = "value", position + 1
+            case "first" | "key", _:
+                key, position, state = token, end, "colon"
+            case "value", _:
+                position, state = end, "separator"
+                yield key, token
+            case _:
+                raise ValueError("JSON object not valid")
+
 if __name__ == "__main__":
     main()
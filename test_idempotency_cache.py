@@ -0,0 +1,145 @@
+# Standard library imports
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Event
+
+# Third-party imports
+import pytest
+
+# Local imports
+from idempotency_cache import IdempotencyCache
+
+
+def main():
+    test_get_put()
+    test_capacity()
+    test_ttl()
+    test_run_once()
+    test_run_once_failure()
+    test_journal()
+    test_journal_compaction()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_put():
+    cache = IdempotencyCache()
+    assert cache.get("create:1") is None
+    cache.put("create:1", True)
+    cache.put("cancel:2", False)
+    assert cache.get("create:1") is True
+    assert cache.get("cancel:2") is False
+    assert len(cache) == 2
+    # A live result is never replaced
+    assert cache.put("create:1", False) is True
+    assert cache.get("create:1") is True
+
+
+def test_capacity():
+    cache = IdempotencyCache(capacity=2)
+    cache.put("1", True)
+    cache.put("2", True)
+    # Using a key makes the other one the least recently used
+    assert cache.get("1")
+    cache.put("3", True)
+    assert cache.get("2") is None
+    assert cache.get("1") and cache.get("3")
+    assert len(cache) == 2
+
+
+def test_ttl():
+    clock = Clock()
+    cache = IdempotencyCache(ttl=60, clock=clock)
+    cache.put("1", True)
+    clock.now += 59
+    assert cache.get("1")
+    clock.now += 1
+    assert cache.get("1") is None
+    assert len(cache) == 0
+
+
+def test_run_once():
+    cache = IdempotencyCache()
+    started = Event()
+    release = Event()
+    calls = []
+
+    def request():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return len(calls)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(cache.run_once, "1", request)
+        started.wait()
+        # The second request waits for the first one to finish
+        second = executor.submit(cache.run_once, "1", request)
+        release.set()
+        assert first.result() == second.result() == 1
+    assert calls == [1]
+    assert cache.run_once("1", request) == 1
+
+
+def test_run_once_failure():
+    cache = IdempotencyCache()
+
+    def failure():
+        raise OSError("Database not available")
+
+    with pytest.raises(OSError):
+        cache.run_once("1", failure)
+    assert cache.get("1") is None
+    assert cache.run_once("1", lambda: True) is True
+
+
+def test_journal():
+    with TemporaryDirectory() as directory:
+        path = str(Path(directory) / "keys.jsonl")
+        clock = Clock()
+        cache = IdempotencyCache(path, ttl=60, clock=clock)
+        cache.put("1", True)
+        clock.now += 30
+        cache.put("2", False)
+        with open(path, "a") as journal:
+            journal.write('["3", 10')
+        assert IdempotencyCache(path, clock=clock).get("2") is False
+        clock.now += 30
+        reloaded = IdempotencyCache(path, ttl=60, clock=clock)
+        assert reloaded.get("1") is None
+        assert reloaded.get("2") is False
+        assert len(reloaded) == 1
+        # Loading only rewrites the journal to drop a broken last line
+        assert Path(path).read_text() == (
+            '["1", 1000.0, true]\n["2", 1030.0, false]\n'
+        )
+
+
+def test_journal_compaction():
+    with TemporaryDirectory() as directory:
+        path = Path(directory) / "keys.jsonl"
+        cache = IdempotencyCache(str(path), capacity=2)
+        for key in range(10):
+            cache.put(str(key), True)
+        assert len(path.read_text().splitlines()) <= 4
+        reloaded = IdempotencyCache(str(path), capacity=2)
+        assert reloaded.get("9") and reloaded.get("8")
+        assert reloaded.get("7") is None
+        # A journal at twice the capacity is compacted when loaded
+        lines = path.read_text()
+        with open(path, "a") as journal:
+            journal.write(lines * 4)
+        IdempotencyCache(str(path), capacity=2)
+        assert len(path.read_text().splitlines()) == 2
+        assert list(Path(directory).iterdir()) == [path]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Standard library imports
+from random import Random
+
+# Local imports
+from interval_index import IntervalIndex
+
+
+def main():
+    test_overlapping()
+    test_load_at()
+    test_peak_load()
+    test_against_scan()
+
+
+def test_overlapping():
+    index = IntervalIndex([(720, 840, 1), (780, 900, 2), (1200, 1320, 3)])
+    assert index.overlapping(800, 850) == [(720, 840, 1), (780, 900, 2)]
+    assert index.overlapping(840, 1200) == [(780, 900, 2)]
+    assert index.overlapping(900, 1200) == []
+    assert index.containing(1319) == [(1200, 1320, 3)]
+    assert IntervalIndex().overlapping(0, 1440) == []
+
+
+def test_load_at():
+    index = IntervalIndex([(1200, 1320, 1), (1230, 1350, 2), (1320, 1440, 4)])
+    assert index.load_at(1199) == 0
+    assert index.load_at(1230) == 3
+    assert index.load_at(1320) == 6
+    assert index.load_at(1440) == 0
+
+
+def test_peak_load():
+    index = IntervalIndex([(1200, 1320, 1), (1230, 1350, 2), (1320, 1440, 4)])
+    assert index.peak_load(1200, 1230) == 1
+    assert index.peak_load(1200, 1440) == 6
+    assert index.peak_load(1350, 1440) == 4
+    # An interval ending when another starts does not overlap it
+    assert IntervalIndex([(0, 60, 3), (60, 120, 3)]).peak_load(0, 120) == 3
+
+
+def test_against_scan():
+    generator = Random(1)
+    intervals = []
+    for value in range(300):
+        start = generator.randrange(1440)
+        intervals.append((start, start + generator.randrange(1, 240), value))
+    index = IntervalIndex(intervals)
+    for _ in range(300):
+        start = generator.randrange(1700)
+        end = start + generator.randrange(1, 120)
+        assert sorted(index.overlapping(start, end)) == sorted(
+            interval for interval in intervals
+            if interval[0] < end and interval[1] > start
+        )
+        assert index.peak_load(start, end) == max(
+            sum(
+                value for interval_start, interval_end, value in intervals
+                if interval_start <= instant < interval_end
+            )
+            for instant in range(start, end)
+        )
+
+
+if __name__ == "__main__":
+    main()
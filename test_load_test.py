@@ -0,0 +1,101 @@
+# Standard library imports
+from datetime import date
+
+# Local imports
+from load_test import generate_name
+from load_test import generate_traffic
+from load_test import count_overbooked_services
+from load_test import count_duplicate_names
+from load_test import run_load_test
+from reservation import validate_name
+from reservation import validate_time
+from reservation import validate_duration
+from test_reservation import temporary_database
+
+
+def main():
+    test_generate_name()
+    test_generate_traffic()
+    test_count_overbooked_services()
+    test_count_duplicate_names()
+    test_run_load_test()
+
+
+def test_generate_name():
+    names = [generate_name(i) for i in range(1000)]
+    assert len(set(names)) == 1000
+    for name in names:
+        assert validate_name(name) == name
+
+
+def test_generate_traffic():
+    traffic = generate_traffic(500, 10, seed=1)
+    assert len(traffic) == 500
+    assert traffic == generate_traffic(500, 10, seed=1)
+    assert len({name for _, name, *_ in traffic}) <= 10
+    for operation, _, rdate, rtime, people, duration, key in traffic:
+        assert operation in ("book", "lookup", "update", "cancel")
+        assert (key is None) == (operation == "lookup")
+        day, month, year = map(int, rdate.split("-"))
+        assert validate_time(date(year, month, day), rtime)
+        assert 1 <= int(people) <= 16
+        assert validate_duration(duration)
+    retried = generate_traffic(500, 10, retries=0.5, seed=1)
+    keys = [operation[-1] for operation in retried if operation[-1]]
+    assert len(retried) > 500
+    assert len(set(keys)) == len([key for *_, key in traffic if key])
+
+
+def test_count_overbooked_services():
+    assert count_overbooked_services([]) == 0
+    assert count_overbooked_services(
+        [
+            {"date": "2027-08-04", "time": "20:00", "people": 12},
+            {"date": "2027-08-04", "time": "20:00", "people": 4},
+            {"date": "2027-08-04", "time": "22:00", "people": 16},
+            {"date": "2027-08-05", "time": "20:00", "people": 16},
+        ]
+    ) == 0
+    assert count_overbooked_services(
+        [
+            {"date": "2027-08-04", "time": "20:00", "people": 12},
+            {"date": "2027-08-04", "time": "20:00", "people": 5},
+        ]
+    ) == 1
+    assert count_overbooked_services(
+        [
+            {
+                "date": "2027-08-04", "time": "20:00", "people": 12,
+                "duration": 150,
+            },
+            {"date": "2027-08-04", "time": "22:00", "people": 8},
+        ]
+    ) == 1
+
+
+def test_count_duplicate_names():
+    assert count_duplicate_names([]) == 0
+    assert count_duplicate_names(
+        [
+            {"name": "Dani Berrocal", "date": "2027-08-04"},
+            {"name": "Joe Gómez", "date": "2027-08-04"},
+            {"name": "Dani Berrocal", "date": "2027-08-05"},
+            {"name": "Dani Berrocal", "date": "2027-08-04"},
+        ]
+    ) == 2
+
+
+def test_run_load_test():
+    with temporary_database():
+        report = run_load_test(generate_traffic(300, 20, seed=1), 1)
+    assert report["operations"] == report["completed"] == 300
+    assert sum(report["errors"].values()) == 0
+    assert sum(map(len, report["latencies"].values())) == 300
+    assert report["unverified_names"] == 0
+    assert report["overbooked"] == 0
+    assert report["duplicate_names"] == 0
+    assert report["lost_updates"] == 0
+
+
+if __name__ == "__main__":
+    main()
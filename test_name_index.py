@@ -0,0 +1,151 @@
+# Standard library imports
+from itertools import repeat
+from random import Random
+
+# Local imports
+from name_index import NameIndex
+from name_index import fold_name
+from name_index import get_trigrams
+
+
+def main():
+    test_fold_name()
+    test_get_trigrams()
+    test_search()
+    test_search_every_word()
+    test_search_against_scan()
+    test_complete()
+    test_complete_against_scan()
+    test_add_and_remove()
+
+
+def test_fold_name():
+    assert fold_name("Martiño Rodríguez") == "martino rodriguez"
+    assert fold_name("  JOE   Gómez ") == "joe gomez"
+    assert fold_name("") == ""
+
+
+def test_get_trigrams():
+    assert get_trigrams("ana") == {"  a", " an", "ana", "na "}
+    assert get_trigrams("a") == {"  a", " a "}
+
+
+def test_search():
+    index = NameIndex(
+        ["Martiño Rodríguez", "Dani Berrocal", "Joe Gómez", "Marta Ruiz"]
+    )
+    assert index.search("martino rodriguez")[0] == "Martiño Rodríguez"
+    assert index.search("Martinho Rodrigez")[0] == "Martiño Rodríguez"
+    assert index.search("dany berocal")[0] == "Dani Berrocal"
+    assert index.search("gomez") == ["Joe Gómez"]
+    assert index.search("xyz") == []
+    assert index.search("") == []
+
+
+def test_search_every_word():
+    # The exact last name must not be hidden by a close first name
+    index = NameIndex(["Marta Ruiz", "Dani Rodríguez"])
+    assert index.search("martino rodriguez") == [
+        "Dani Rodríguez", "Marta Ruiz"
+    ]
+    index = NameIndex(["Marta Gómez", "Dani Rodríguez"])
+    assert index.search("Mart Rodríguez", limit=1) == ["Dani Rodríguez"]
+
+
+def test_search_against_scan():
+    generator = Random(0)
+    letters = "abcdeilmnorstu"
+    words = [
+        "".join(generator.choices(letters, k=generator.randint(3, 7)))
+        for _ in range(60)
+    ]
+    names = {
+        f"{generator.choice(words)} {generator.choice(words)}"
+        for _ in range(500)
+    }
+    index = NameIndex(names)
+    for _ in range(50):
+        query = f"{generator.choice(words)[1:]} {generator.choice(words)}"
+        matches = [index._match_word(token, 0.5) for token in query.split()]
+        scores = sorted(
+            (score(name, matches) for name in names), reverse=True
+        )
+        assert sorted(
+            (score(name, matches) for name in index.search(query)),
+            reverse=True,
+        ) == [value for value in scores[:5] if value > 0]
+
+
+def score(name, matches):
+    return sum(
+        max(map(match.get, name.split(), repeat(0))) for match in matches
+    ) / len(matches)
+
+
+def test_complete():
+    index = NameIndex(
+        ["Martiño Rodríguez", "Marta Ruiz", "Dani Rodríguez", "Joe Gómez"]
+    )
+    assert index.complete("mart") == ["Marta Ruiz", "Martiño Rodríguez"]
+    assert index.complete("rodr") == ["Dani Rodríguez", "Martiño Rodríguez"]
+    assert index.complete("martino rod") == ["Martiño Rodríguez"]
+    assert index.complete("rodr", limit=1) == ["Dani Rodríguez"]
+    assert index.complete("zz") == []
+
+
+def test_complete_against_scan():
+    generator = Random(0)
+    words = ["ana", "anabel", "andrés", "ángel", "bea", "beatriz", "berto"]
+    names = {
+        " ".join(generator.choices(words, k=generator.randint(2, 3))).title()
+        for _ in range(300)
+    }
+    # A rare whole word is looked up differently
+    names |= {"Zoe Ana", "Ángel Zoe Beatriz", "Zoe Andrés"}
+    index = NameIndex(names)
+    for prefix in [
+        "an", "ana", "be", "ana an", "bea be", "ana bea an", "zz",
+        "zoe an", "zoe a", "zoe ángel b", "ana zoe", "zoe zz",
+    ]:
+        *whole_words, partial = fold_name(prefix).split()
+        matches = sorted(
+            (
+                min(
+                    word for word in fold_name(name).split()
+                    if word.startswith(partial)
+                ),
+                fold_name(name),
+                name,
+            )
+            for name in names
+            if any(
+                word.startswith(partial) for word in fold_name(name).split()
+            )
+            and all(
+                word in fold_name(name).split() for word in whole_words
+            )
+        )
+        expected = list(dict.fromkeys(name for *_, name in matches))
+        for limit in (1, 3, 100):
+            assert index.complete(prefix, limit) == expected[:limit]
+
+
+def test_add_and_remove():
+    index = NameIndex()
+    index.add("Dani Berrocal")
+    index.add("Dani Berrócal")
+    assert "Dani Berrocal" in index
+    assert sorted(index.search("dani berrocal")) == [
+        "Dani Berrocal", "Dani Berrócal"
+    ]
+    index.remove("Dani Berrocal")
+    assert "Dani Berrocal" not in index
+    assert index.search("dani berrocal") == ["Dani Berrócal"]
+    index.remove("Dani Berrócal")
+    index.remove("Joe Gómez")
+    assert index.search("dani berrocal") == []
+    assert index.complete("dani") == []
+
+
+if __name__ == "__main__":
+    main()
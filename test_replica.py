@@ -0,0 +1,127 @@
+# Standard library imports
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from io import StringIO
+from json import loads
+from multiprocessing.connection import Listener
+from threading import Thread
+from unittest.mock import patch
+
+# Local imports
+from replica import ReservationReplica
+from reservation import Reservation
+from test_reservation import book_reservations, temporary_database
+
+
+def main():
+    test_change_log_position()
+    test_concurrent_changes()
+    test_replica()
+    test_replica_snapshot_replay()
+    test_replica_search()
+    test_replica_serve()
+
+
+def reservation(name, people="4"):
+    rdate = date.today() + timedelta(days=7)
+    return Reservation(name, rdate.strftime("%d-%m-%Y"), "20:00", people)
+
+
+def test_change_log_position():
+    with temporary_database() as database:
+        assert Reservation._get_change_log_position() == (0, 0)
+        Reservation._book_reservation(reservation("Dani Berrocal"))
+        Reservation._remove_reservation("Dani Berrocal")
+        size = (database / "changes.jsonl").stat().st_size
+        assert Reservation._get_change_log_position() == (2, size)
+        with open(database / "changes.jsonl", "a") as change_log:
+            change_log.write('{"sequence": 3, "oper')
+        assert Reservation._get_change_log_position() == (2, size)
+
+
+def test_concurrent_changes():
+    with temporary_database() as database:
+        append_change = Reservation._Reservation__append_change
+        record = reservation("Dani Berrocal")._as_record()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for _ in range(400):
+                executor.submit(append_change, "create", record)
+        sequences = [
+            loads(line)["sequence"]
+            for line in (database / "changes.jsonl").read_text().splitlines()
+        ]
+        assert sequences == list(range(1, 401))
+        assert Reservation._get_change_log_position()[0] == 400
+
+
+def test_replica():
+    with temporary_database():
+        Reservation._book_reservation(reservation("Dani Berrocal"))
+        replica = ReservationReplica()
+        assert replica.sequence == 1
+        assert replica.lag == 0
+        Reservation._book_reservation(reservation("Joe Gómez", "6"))
+        Reservation._remove_reservation("Dani Berrocal")
+        assert replica.lag == 2
+        assert replica.lookup("Joe Gómez")["people"] == 6
+        assert replica.lookup("Dani Berrocal") is None
+        assert replica.lag == 0
+        assert len(replica) == 1
+
+
+def test_replica_snapshot_replay():
+    with temporary_database():
+        Reservation._book_reservation(reservation("Dani Berrocal"))
+        snapshot = Reservation._take_snapshot()
+        # Changes made while the snapshot was read are replayed safely
+        Reservation._remove_reservation("Dani Berrocal")
+        snapshot["reservations"] = Reservation._take_snapshot()["reservations"]
+        replica = ReservationReplica(snapshot)
+        assert replica.refresh() == 1
+        assert replica.lookup("Dani Berrocal") is None
+        assert replica.sequence == 2
+
+
+def test_replica_search():
+    with temporary_database():
+        Reservation._book_reservation(reservation("Martiño Rodríguez"))
+        replica = ReservationReplica()
+        Reservation._book_reservation(reservation("Joe Gómez", "6"))
+        assert replica.search("martino rodrigez")[0]["name"] == (
+            "Martiño Rodríguez"
+        )
+        assert replica.search("Joe")[0]["people"] == 6
+        Reservation._remove_reservation("Joe Gómez")
+        assert replica.search("Joe") == []
+
+
+def test_replica_serve():
+    with temporary_database():
+        book_reservations()
+        replica = ReservationReplica()
+        output = StringIO()
+        with Listener(("localhost", 0)) as listener:
+            Thread(target=replica.serve, args=(listener,), daemon=True).start()
+            with patch.object(
+                Reservation, "_replica_address", listener.address
+            ), redirect_stdout(output):
+                Reservation._print_similar_names("Martino Rodrigez")
+                Reservation._print_similar_names("Xyz Qqq")
+        # Without a replica listening only the message is printed
+        with Listener(("localhost", 0)) as listener:
+            address = listener.address
+        with patch.object(
+            Reservation, "_replica_address", address
+        ), redirect_stdout(output):
+            Reservation._print_similar_names("Martino Rodrigez")
+        assert output.getvalue() == (
+            "There is no reservation with that name. Did you mean:\n"
+            "- Martiño Rodríguez\n"
+            "There is no reservation with that name.\n"
+            "There is no reservation with that name.\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
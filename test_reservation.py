@@ -1,14 +1,27 @@
 # Standard library imports
-from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from csv import DictReader
+from datetime import date, timedelta
+from io import StringIO
+from json import load, loads
+from os.path import join
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import sleep
+from unittest.mock import patch
 
 # Third-party imports
 import pytest
 
 # Local imports
+from reservation import Reservation
 from reservation import validate_name
 from reservation import validate_date
 from reservation import validate_time
 from reservation import validate_people
+from reservation import validate_duration
+from reservation import stream_json_object
 
 
 def main():
@@ -16,6 +29,15 @@ def main():
     test_validate_date()
     test_validate_time()
     test_validate_people()
+    test_validate_duration()
+    test_stream_json_object()
+    test_iter_reservations()
+    test_export_reservations()
+    test_tables_schedule()
+    test_display_manifest()
+    test_change_reservation()
+    test_idempotent_requests()
+    test_concurrent_idempotent_requests()
 
 
 def test_validate_name():
@@ -46,20 +68,27 @@ def test_validate_date():
 
 
 def test_validate_time():
-    assert validate_time(date(2025, 12, 23), "12:00")
-    assert validate_time(date(2025, 12, 23), "14:00")
-    assert validate_time(date(2025, 12, 23), "20:00")
-    assert validate_time(date(2025, 12, 23), "22:00")
+    future = date.today() + timedelta(days=7)
+    assert validate_time(future, "12:00")
+    assert validate_time(future, "14:00")
+    assert validate_time(future, "20:00")
+    assert validate_time(future, "22:00")
+    assert validate_time(future, "14:30")
+    assert validate_time(future, "20:45")
     with pytest.raises(ValueError):
         validate_time(date(2023, 12, 23), "12:00")
     with pytest.raises(AttributeError):
-        validate_time(date(2025, 12, 23), "14:30")
+        validate_time(future, "16:30")
     with pytest.raises(AttributeError):
-        validate_time(date(2025, 12, 23), "22h")
+        validate_time(future, "22:15")
     with pytest.raises(AttributeError):
-        validate_time(date(2025, 12, 23), "11 PM")
+        validate_time(future, "25:00")
     with pytest.raises(AttributeError):
-        validate_time(date(2025, 12, 23), "20-00")
+        validate_time(future, "22h")
+    with pytest.raises(AttributeError):
+        validate_time(future, "11 PM")
+    with pytest.raises(AttributeError):
+        validate_time(future, "20-00")
 
 
 def test_validate_people():
@@ -74,5 +103,281 @@ def test_validate_people():
         validate_people("seventeen")
 
 
+def test_validate_duration():
+    assert validate_duration("30") == 30
+    assert validate_duration("120") == 120
+    assert validate_duration("240") == 240
+    with pytest.raises(ValueError):
+        validate_duration("15")
+    with pytest.raises(ValueError):
+        validate_duration("300")
+    with pytest.raises(AttributeError):
+        validate_duration("2h")
+    with pytest.raises(AttributeError):
+        validate_duration("-90")
+
+
+def test_stream_json_object():
+    database = (
+        '{\n    "1": {"name": "Dani Berrocal", "people": 4},\n'
+        '    "2": {"name": "Joe Gómez", "people": 12}\n}'
+    )
+    assert list(stream_json_object(StringIO(database), chunk_size=5)) == [
+        ("1", {"name": "Dani Berrocal", "people": 4}),
+        ("2", {"name": "Joe Gómez", "people": 12}),
+    ]
+    second_member = StringIO(database[database.index('"2"'):])
+    assert list(stream_json_object(second_member, True)) == [
+        ("2", {"name": "Joe Gómez", "people": 12}),
+    ]
+    assert list(stream_json_object(StringIO("{\n    \n}"))) == []
+    with pytest.raises(ValueError):
+        list(stream_json_object(StringIO('{"1": {"name": ')))
+    with pytest.raises(ValueError):
+        list(stream_json_object(StringIO("[1, 2]")))
+
+
+
+def test_iter_reservations():
+    with temporary_database() as directory:
+        book_reservations()
+        with open(directory / "database.json") as database:
+            reservations = list(load(database).values())
+        dates = sorted({reservation["date"] for reservation in reservations})
+        assert list(Reservation._iter_reservations()) == reservations
+        assert_reads_by_date(reservations, dates)
+        # Without the index the database is read from the start
+        (directory / "index.json").rename(directory / "stale.json")
+        assert_reads_by_date(reservations, dates)
+        # An index saved before the last write is not used either
+        Reservation._book_reservation(reservation("Ana Núñez", 1, "12:30"))
+        (directory / "stale.json").replace(directory / "index.json")
+        with open(directory / "database.json") as database:
+            reservations = list(load(database).values())
+        assert_reads_by_date(reservations, dates)
+
+
+def test_export_reservations():
+    with temporary_database():
+        book_reservations()
+        start = date.today() + timedelta(days=2)
+        end = date.today() + timedelta(days=3)
+        expected = list(Reservation._iter_reservations(start, end))
+        output = StringIO()
+        assert Reservation._export_reservations(
+            output, "csv", start, end
+        ) == 4
+        output.seek(0)
+        assert [
+            {**row, "people": int(row["people"]),
+             "duration": int(row["duration"])}
+            for row in DictReader(output)
+        ] == expected
+        output = StringIO()
+        assert Reservation._export_reservations(
+            output, "jsonl", start, end
+        ) == 4
+        assert [
+            loads(line) for line in output.getvalue().splitlines()
+        ] == expected
+        with pytest.raises(ValueError):
+            Reservation._export_reservations(StringIO(), "xml", start, end)
+
+
+def test_tables_schedule():
+    with temporary_database():
+        book_reservations()
+        rdate = date.today() + timedelta(days=2)
+        Reservation._tables_schedules.clear()
+        with patch.object(
+            Reservation, "_iter_reservations",
+            wraps=Reservation._iter_reservations,
+        ) as iter_reservations:
+            schedule = Reservation._get_tables_schedule(rdate)
+            assert schedule.overlapping(0, 24 * 60) == [
+                (720, 840, 1, "Dani Berrocal", 4),
+                (1260, 1380, 1, "Íñigo Ibáñez", 4),
+            ]
+            assert Reservation._get_tables_schedule(rdate) is schedule
+            # Only the reservations of the date are read, once
+            iter_reservations.assert_called_once_with(rdate, rdate)
+            # Writes refresh the schedules in memory without reading
+            assert Reservation._book_reservation(
+                reservation("Ana Núñez", 2, "20:30")
+            )
+            assert Reservation._get_tables_schedule(rdate).peak_load(
+                1260, 1261
+            ) == 2
+            iter_reservations.assert_called_once()
+        # Another process builds the schedule from the database
+        Reservation._tables_schedules.clear()
+        assert Reservation._get_tables_schedule(rdate).peak_load(
+            1260, 1261
+        ) == 2
+        # Writes update the schedule of the date
+        for name in ("Joe Pérez", "Zoe Gómez"):
+            assert Reservation._book_reservation(
+                reservation(name, 2, "20:30")
+            )
+        assert Reservation._get_tables_schedule(rdate).peak_load(
+            1260, 1261
+        ) == 4
+        assert not Reservation._book_reservation(
+            reservation("Dani Ruiz", 2, "22:00")
+        )
+        # The tables are free again when the reservations end
+        assert Reservation._book_reservation(
+            reservation("Dani Ruiz", 2, "20:00", "4", "30")
+        )
+
+
+def test_display_manifest():
+    with temporary_database():
+        book_reservations()
+        rdate = (date.today() + timedelta(days=1)).strftime("%d-%m-%Y")
+        output = StringIO()
+        with (
+            patch("builtins.input", side_effect=[rdate, "14:00"]),
+            redirect_stdout(output),
+        ):
+            Reservation.display_manifest()
+        assert output.getvalue() == (
+            "13:00  Joe Gómez, 4 people, 120 minutes\n"
+            "Total people expected: 4. Tables in use: 1 of 4.\n"
+        )
+
+
+def test_change_reservation():
+    with temporary_database():
+        assert Reservation._book_reservation(reservation("Dani Berrocal"))
+        previous = Reservation._find_reservation("Dani Berrocal")
+        change = reservation("Dani Berrocal", rtime="21:00")
+        # The previous reservation is restored if booking raises
+        with (
+            patch.object(
+                Reservation, "_check_reservation_availability",
+                side_effect=ValueError("JSON object not valid"),
+            ),
+            pytest.raises(ValueError),
+        ):
+            Reservation._change_reservation("Dani Berrocal", change)
+        assert Reservation._find_reservation("Dani Berrocal") == previous
+        assert Reservation._get_change_log_position()[0] == 3
+        assert Reservation._change_reservation("Dani Berrocal", change)
+        assert Reservation._find_reservation("Dani Berrocal")["time"] == (
+            "21:00"
+        )
+        assert not Reservation._change_reservation("Joe Gómez", change)
+
+
+def test_idempotent_requests():
+    with temporary_database():
+        booking = reservation("Dani Berrocal")
+        assert Reservation._book_reservation(booking, "1")
+        # A retry is answered from the cache although the name is taken
+        assert Reservation._book_reservation(booking, "1")
+        assert not Reservation._book_reservation(booking, "2")
+        assert Reservation._get_change_log_position()[0] == 1
+        # A key cannot be reused for a different request
+        with pytest.raises(ValueError):
+            Reservation._book_reservation(reservation("Joe Gómez"), "1")
+        with pytest.raises(ValueError):
+            Reservation._book_reservation(
+                reservation("Dani Berrocal", rtime="21:00"), "1"
+            )
+        assert Reservation._find_reservation("Joe Gómez") is None
+        change = reservation("Dani Berrocal", rtime="21:00")
+        assert Reservation._change_reservation("Dani Berrocal", change, "1")
+        assert Reservation._change_reservation("Dani Berrocal", change, "1")
+        assert Reservation._get_change_log_position()[0] == 3
+        assert Reservation._remove_reservation("Dani Berrocal", "1")
+        assert Reservation._remove_reservation("Dani Berrocal", "1")
+        assert not Reservation._remove_reservation("Dani Berrocal", "2")
+        with pytest.raises(ValueError):
+            Reservation._remove_reservation("Joe Gómez", "1")
+        assert Reservation._get_change_log_position()[0] == 4
+        # Results survive a restart through the journal
+        Reservation._idempotency_caches.pop(Reservation._idempotency_journal)
+        assert Reservation._book_reservation(booking, "1")
+        assert Reservation._find_reservation("Dani Berrocal") is None
+
+
+def test_concurrent_idempotent_requests():
+    with temporary_database():
+        booking = reservation("Dani Berrocal")
+        check = Reservation._check_reservation_availability
+
+        def slow_check(user_reservation):
+            sleep(0.1)
+            return check(user_reservation)
+
+        with patch.object(
+            Reservation, "_check_reservation_availability", slow_check
+        ), ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(
+                lambda _: Reservation._book_reservation(booking, "1"),
+                range(2),
+            ))
+        assert results == [True, True]
+        assert len(list(Reservation._iter_reservations())) == 1
+        assert Reservation._get_change_log_position()[0] == 1
+
+
+@contextmanager
+def temporary_database():
+    files = {
+        "_database_path": "database.json",
+        "_database_index": "index.json",
+        "_change_log": "changes.jsonl",
+        "_idempotency_journal": "keys.jsonl",
+    }
+    previous = {
+        attribute: getattr(Reservation, attribute) for attribute in files
+    }
+    with TemporaryDirectory() as directory:
+        for attribute, filename in files.items():
+            setattr(Reservation, attribute, join(directory, filename))
+        with open(Reservation._database_path, "w") as database:
+            database.write("{\n    \n}")
+        try:
+            yield Path(directory)
+        finally:
+            for attribute, value in previous.items():
+                setattr(Reservation, attribute, value)
+
+
+def reservation(name, days=7, rtime="20:00", people="4", duration="120"):
+    rdate = date.today() + timedelta(days=days)
+    return Reservation(
+        name, rdate.strftime("%d-%m-%Y"), rtime, people, duration
+    )
+
+
+def book_reservations():
+    for name, days, rtime in [
+        ("Martiño Rodríguez", 1, "20:00"),
+        ("Joe Gómez", 1, "13:00"),
+        ("Íñigo Ibáñez", 2, "21:00"),
+        ("Dani Berrocal", 2, "12:00"),
+        ("Begoña Muñoz", 3, "14:15"),
+        ("Zoe Ruiz", 3, "20:30"),
+        ("Álvaro Pérez", 5, "22:00"),
+    ]:
+        assert Reservation._book_reservation(reservation(name, days, rtime))
+
+
+def assert_reads_by_date(reservations, dates):
+    for first in range(len(dates)):
+        for last in range(first, len(dates)):
+            start = date.fromisoformat(dates[first])
+            end = date.fromisoformat(dates[last])
+            assert list(Reservation._iter_reservations(start, end)) == [
+                reservation for reservation in reservations
+                if dates[first] <= reservation["date"] <= dates[last]
+            ]
+    day_after = date.fromisoformat(dates[-1]) + timedelta(days=1)
+    assert list(Reservation._iter_reservations(day_after)) == []
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file